@@ -8,19 +8,21 @@ from flask import Flask
 from flask_cors import CORS
 from werkzeug.middleware.proxy_fix import ProxyFix
 
+from api.backend.utils.containers import ContainerImageIndex
 from api.backend.utils.database import Database
+from api.backend.utils.functions import FunctionRegistry
+from api.backend.utils.log_config import configure_logging
+from api.backend.utils.metrics import init_request_metrics
+from api.backend.utils.poller import StatusPoller
+from api.backend.utils.results import ResultStore
+from api.backend.utils.submission import SubmissionEngine
 
-# create and configure logger
-logging.basicConfig(
-    level=logging.INFO,
-    datefmt="%Y-%m-%dT%H:%M:%S",
-    format="%(asctime)-15s.%(msecs)03dZ %(levelname)-7s : %(name)s - %(message)s",
-)
 # create log object with current module name
 log = logging.getLogger(__name__)
 
 
 load_dotenv(override=True)
+configure_logging()
 
 # logging.info('env: ',dotenv.dotenv_values().keys())
 # logging.info("Loading configuration from .env file", os.environ['USER_SCOPES'])
@@ -33,7 +35,9 @@ CORS(
     app,
     supports_credentials=True,
     resources={r"/*": {"origins": HOST}},
+    expose_headers=["Server-Timing"],
 )
+init_request_metrics(app)
 config = dotenv_values()
 app.config.from_mapping(config)
 # app.secret_key = os.environ.get('SECRET_KEY', 'DEFAULT_SECRET_KEY')
@@ -41,3 +45,15 @@ app.config.from_mapping(config)
 with app.app_context():
     database = Database(app)
     database.ensure_tables_exist()
+
+function_registry = FunctionRegistry(database)
+container_images = ContainerImageIndex(database)
+result_store = ResultStore(database)
+
+status_poller = StatusPoller(app, database, result_store)
+if status_poller.enabled:
+    status_poller.start()
+
+submission_engine = SubmissionEngine(
+    database, function_registry, container_images, status_poller
+)
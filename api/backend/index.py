@@ -1,32 +1,66 @@
+import json
 import logging
 import os
-from datetime import datetime
-
-import requests
-from flask import flash, jsonify, make_response, redirect, request, session, url_for
+import queue
+
+from flask import (
+    Response,
+    flash,
+    jsonify,
+    make_response,
+    redirect,
+    request,
+    session,
+    stream_with_context,
+    url_for,
+)
 from globus_compute_sdk import Executor as GlobusComputeExecutor
 
 from api.backend.utils.decorators import authenticated
-from api.backend.utils.login_flow import initialize_globus_compute_client
-from api.backend.utils.utils import get_safe_redirect, load_portal_client
-
-from . import app, database
-
-# create and configure logger
-logging.basicConfig(
-    level=logging.INFO,
-    datefmt="%Y-%m-%dT%H:%M:%S",
-    format="%(asctime)-15s.%(msecs)03dZ %(levelname)-7s : %(name)s - %(message)s",
+from api.backend.utils.endpoints import list_active_endpoints
+from api.backend.utils.login_flow import (
+    client_pool,
+    compute_client_for,
+    initialize_globus_compute_client,
 )
+from api.backend.utils.metrics import metrics, span
+from api.backend.utils.pagination import is_paginated, paginate, parse_listing_args
+from api.backend.utils.task_status import (
+    is_terminal,
+    load_task_statuses,
+    status_from_record,
+    wait_for_task,
+)
+from api.backend.utils.results import task_output
+from api.backend.utils.utils import (
+    get_portal_client,
+    get_safe_redirect,
+    load_portal_client,
+)
+from api.backend.utils.wrappers import log_tail_wrapper
+
+from . import (
+    app,
+    database,
+    function_registry,
+    result_store,
+    status_poller,
+    submission_engine,
+)
+
 # create log object with current module name
 log = logging.getLogger(__name__)
 
 HOST = os.environ.get("HOST")
+STATUS_STREAM_HEARTBEAT = 15
+LOG_TAIL_MAX_BYTES = int(os.environ.get("LOG_TAIL_MAX_BYTES", 1024 * 1024))
+LOG_TAIL_CHUNK_BYTES = 64 * 1024
+LOG_TAIL_TIMEOUT = float(os.environ.get("LOG_TAIL_TIMEOUT", 30))
 
 @app.route("/", methods=["GET"])
 def home():
     """Home route."""
-    log.info(f"Home route redirecting to {HOST}/sign-in")
+    log.info("Home route redirecting to %s/sign-in", HOST)
     return redirect(HOST + "/sign-in")
 
 
@@ -53,95 +87,157 @@ def is_authenticated():
     return jsonify({"is_authenticated": True})
 
 
+@app.route("/api/stats", methods=["GET"])
+@authenticated
+def stats():
+    """Counters of the backend's in-process pools and caches."""
+    return jsonify({"compute_client_pool": client_pool.stats()})
+
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Request and hot-path timings in the Prometheus text format.
+
+    Served outside ``/api``, which is the only prefix routed to the backend
+    from outside, so only scrapers on the internal network reach it. When
+    ``METRICS_TOKEN`` is set, they must also send it as a bearer token.
+    """
+    metrics_token = os.environ.get("METRICS_TOKEN")
+    if metrics_token and request.headers.get("Authorization") != (
+        f"Bearer {metrics_token}"
+    ):
+        return jsonify({"message": "Invalid metrics token"}), 401
+    return Response(
+        metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.route("/api/list_active_endpoints", methods=["GET"])
 @authenticated
 def diamond_list_active_endpoints():
-    globus_compute_client = initialize_globus_compute_client()
-    active_endpoints = []
-    endpoints = globus_compute_client.get_endpoints()
-    for endpoint in endpoints:
-        endpoint_uuid = endpoint["uuid"]
-        endpoint_status = globus_compute_client.get_endpoint_status(
-            endpoint_uuid=endpoint_uuid
-        )["status"]
-        if endpoint_status == "online":
-            active_endpoints.append(
-                {"endpoint_name": endpoint["name"], "endpoint_uuid": endpoint_uuid}
-            )
-    logging.info(active_endpoints)
+    database.release_db()
+    active_endpoints = list_active_endpoints(
+        session["primary_identity"], initialize_globus_compute_client()
+    )
+    log.debug("active endpoints: %s", active_endpoints)
     return active_endpoints
 
 
-def container_builder_wrapper(base_image, location, name):
-    import os
-    import textwrap
-    load_apptainer = "module load tacc-apptainer"
-    load_apptainer = textwrap.dedent(load_apptainer.strip())
-    command = f"apptainer pull {location}/{name} {base_image}"
-    command = textwrap.dedent(command.strip())
-    os.system(f"({load_apptainer}) 2>&1 | tee /work/09912/haotianxie/frontera/log.txt") 
-    os.system(f"({command}) 2>&1 | tee /work/09912/haotianxie/frontera/log.txt")
-    return
-
-
 @app.route("/api/register_container", methods=["POST"])
 @authenticated
 def diamond_endpoint_register_container():
-    globus_compute_client = initialize_globus_compute_client()
-
-    endpoint_id = request.json.get("endpoint")
-    function_id = globus_compute_client.register_function(container_builder_wrapper)
-
-    name = request.json.get("name")
-    base_image = request.json.get("base_image")
-    description = request.json.get("description")
-    location = request.json.get("location")
-
-    logging.info(function_id)
-    logging.info(f"endpoint: {endpoint_id}")
-
-    logging.info(f"{name}\n{base_image}\n{description}\n{location}".format(name, base_image, description, location))
-    
-    container_task_id = globus_compute_client.run(
-        base_image=base_image,
-        location=location,
-        name=name,
-        endpoint_id=endpoint_id,
-        function_id=function_id,
-    )
+    """Build a container image, reusing one already built from the same source.
 
-    database.save_container(
-        container_task_id=container_task_id,
-        identity_id=session["primary_identity"],
-        base_image=base_image,
-        name=name,
-        location=location,
-        description=description,
-    )
-    return jsonify(container_task_id)
+    An image pulled from the same ``base_image`` into the same ``location``
+    on the same endpoint is reused, or attached to while its pull is still
+    running; ``"rebuild": true`` forces a fresh pull. The response reports
+    whether the image came from the cache and where it lives.
+    """
+    try:
+        container = submission_engine.register_container(
+            initialize_globus_compute_client(),
+            session["primary_identity"],
+            request.json,
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    if container["cache_hit"]:
+        message = f"Reusing the image at {container['image_path']}"
+    else:
+        message = f"Building the image at {container['image_path']}"
+    return jsonify({"message": message, **container})
+
+
+def load_container_records(identity_id, conatainers):
+    """Return a record with current build status for each container row."""
+    # containers reusing one image share its build, so look each up once,
+    # with the client of whoever started it
+    in_flight = {}
+    for container in conatainers:
+        if not is_terminal(container["container_status"]):
+            in_flight.setdefault(container["principal"], set()).add(
+                container["build_task_id"]
+            )
+    container_statuses = {}
+    for principal, build_task_ids in in_flight.items():
+        container_statuses.update(
+            status_poller.lookup(
+                "container",
+                identity_id,
+                compute_client_for(principal),
+                list(build_task_ids),
+                principal,
+            )
+        )
+    records = []
+    for container in conatainers:
+        container_task_id = container["container_task_id"]
+        container_status = container_statuses.get(
+            container["build_task_id"], {"status": container["container_status"]}
+        )
+        records.append(
+            {
+                "name": container["name"],
+                "container_task_id": container_task_id,
+                "status": container_status["status"],
+                "base_image": container["base_image"],
+                "location": container["location"],
+                "description": container["description"],
+                "container_create_time": container["container_create_time"],
+                "build_task_id": container["build_task_id"],
+                "image_path": container["image_path"],
+                "cache_hit": bool(container["cache_hit"]),
+            }
+        )
+    return records
+
+
+def load_containers_data(identity_id, **listing):
+    """Return container records for an identity keyed by container name."""
+    conatainers = database.load_containers(identity_id=identity_id, **listing)
+    containers_data = {}
+    for record in load_container_records(identity_id, conatainers):
+        name = record.pop("name")
+        record.pop("container_create_time")
+        containers_data[name] = record
+    return containers_data
 
 
 @app.route("/api/get_containers", methods=["GET"])
 @authenticated
 def get_containers():
-    global_compute_client = initialize_globus_compute_client()
+    """Container build status for the user.
 
-    conatainers = database.load_containers(identity_id=session["primary_identity"])
-    containers_data = {}
-    for container in conatainers:
-        container_task_id = container["container_task_id"]
-        name = container["name"]
-        container_status = global_compute_client.get_task(container_task_id)
-        containers_data[name] = {
-            "container_task_id": container_task_id,
-            "status": container_status["status"],
-            "base_image": container["base_image"],
-            "location": container["location"],
-            "description": container["description"],
+    Without ``limit`` or ``cursor`` every container is returned keyed by
+    name. With them, one page of records is returned newest first together
+    with the ``next_cursor`` to pass for the following page. ``status``,
+    ``created_after`` and ``created_before`` filter either form.
+    """
+    identity_id = session["primary_identity"]
+    try:
+        listing = parse_listing_args(request.args)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    if not is_paginated(request.args):
+        containers_data = load_containers_data(identity_id, **listing)
+        log.debug("container status is %s", containers_data)
+        return jsonify(containers_data)
+
+    limit = listing["limit"]
+    conatainers = database.load_containers(
+        identity_id=identity_id, **{**listing, "limit": limit + 1}
+    )
+    conatainers, next_cursor = paginate(
+        conatainers, limit, "container_create_time", "container_task_id"
+    )
+    return jsonify(
+        {
+            "containers": load_container_records(identity_id, conatainers),
+            "next_cursor": next_cursor,
         }
-
-    logging.info(f"container status is {containers_data}")
-    return jsonify(containers_data)
+    )
 
 
 @app.route("/api/delete_container", methods=["POST"])
@@ -149,85 +245,334 @@ def get_containers():
 def diamond_delete_container():
     container_id = request.json.get("containerId")
     database.delete_container(container_id)
-    logging.info(f"container {container_id} deleted")
+    status_poller.forget(container_id)
+    log.info("container %s deleted", container_id)
     return jsonify({"message": "Container deleted successfully"})
 
 
-def task_wrapper(task_command, log_path, container_path):
-    import os
-    import textwrap
-    if not container_path:
-        command = textwrap.dedent(task_command.strip())
-        os.system(f"({command}) 2>&1 | tee {log_path}")
-        return log_path
-    else:
-        load_apptainer = "module load tacc-apptainer"
-        load_apptainer = textwrap.dedent(load_apptainer.strip())
-        command = f"apptainer run --nv {container_path} {task_command}"
-        command = textwrap.dedent(command.strip())
-        os.system(f"({load_apptainer}) 2>&1 | tee {log_path}")
-        os.system(f"({command}) 2>&1 | tee {log_path}")
-        return log_path
-
-
 @app.route("/api/submit_task", methods=["POST"])
 @authenticated
 def diamond_endpoint_submit_job():
-    globus_compute_client = initialize_globus_compute_client()
-
-    endpoint_id = request.json.get("endpoint")
-    function_id = globus_compute_client.register_function(task_wrapper)
-    task_command = request.json.get("task")
-    log_path = request.json.get("log_path")
-    container_path = request.json.get("container_path")
-
-    task_id = globus_compute_client.run(
-        task_command=task_command,
-        log_path=log_path,
-        container_path=container_path,
-        endpoint_id=endpoint_id,
-        function_id=function_id,
-    )
+    try:
+        task_id = submission_engine.submit_task(
+            initialize_globus_compute_client(),
+            session["primary_identity"],
+            request.json,
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return jsonify(task_id)
+
+
+@app.route("/api/submit_tasks", methods=["POST"])
+@authenticated
+def diamond_endpoint_submit_job_array():
+    """Submit many tasks to one endpoint as a single Globus Compute batch."""
+    try:
+        submitted = submission_engine.submit_tasks(
+            initialize_globus_compute_client(),
+            session["primary_identity"],
+            request.json,
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return jsonify(submitted)
 
-    task_create_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    database.save_task(
-        task_id=task_id,
-        identity_id=session["primary_identity"],
-        task_create_time=task_create_time,
-    )
 
-    logging.info(f"task id is {task_id}")
+@app.route("/api/submit_multi_node_task", methods=["POST"])
+@authenticated
+def diamond_endpoint_submit_multi_node_job():
+    """Submit a task that runs across ``num_nodes`` nodes under MPI."""
+    try:
+        task_id = submission_engine.submit_multi_node_task(
+            initialize_globus_compute_client(),
+            session["primary_identity"],
+            request.json,
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
     return jsonify(task_id)
 
 
+def load_task_changes(identity_id, since):
+    """Response with the tasks changed after the ``since`` version.
+
+    Unfinished tasks are looked up first, which also hands them to the
+    poller again, so a finish is persisted and shows up as a change.
+    """
+    try:
+        version = int(since)
+    except ValueError:
+        return jsonify({"message": "since must be an integer version"}), 400
+
+    statuses = load_task_statuses(
+        status_poller,
+        compute_client_for,
+        identity_id,
+        database.load_tasks(identity_id=identity_id, status="pending"),
+    )
+    # read after the lookup, so versions include what it just persisted
+    tasks = database.load_tasks_changed_since(identity_id, version)
+    statuses.update(
+        load_task_statuses(
+            status_poller,
+            compute_client_for,
+            identity_id,
+            [task for task in tasks if task["task_id"] not in statuses],
+        )
+    )
+    tasks_data = {task["task_id"]: statuses[task["task_id"]] for task in tasks}
+    if tasks:
+        version = tasks[-1]["task_version"]
+    return jsonify({"version": version, "tasks": tasks_data})
+
+
 @app.route("/api/get_task_status", methods=["GET"])
 @authenticated
 def diamond_get_task_status():
-    global_compute_client = initialize_globus_compute_client()
-
-    tasks = database.load_tasks(identity_id=session["primary_identity"])
-    tasks_data = {}
-    for task in tasks:
-        task_id = task["task_id"]
-        logging.info(f"task id is {task_id}")
-        logging.info(f"====================")
-        status = global_compute_client.get_task(task_id)
-        logging.info(f"111111")
-        tasks_data[task_id] = status
-        
-    logging.info(f"task status is {tasks_data}")
-    return jsonify(tasks_data)
+    """Task status for the user.
+
+    Without ``limit`` or ``cursor`` every task is returned keyed by task
+    ID. With them, one page of tasks is returned newest first together with
+    the ``next_cursor`` to pass for the following page. ``status``,
+    ``created_after`` and ``created_before`` filter either form.
+
+    With ``since=<version>`` only tasks created or changed after that
+    version are returned, as ``{"version": ..., "tasks": {...}}``; pass the
+    returned version on the next call. ``since=0`` returns everything.
+    """
+    identity_id = session["primary_identity"]
+    if "since" in request.args:
+        return load_task_changes(identity_id, request.args["since"])
+
+    try:
+        listing = parse_listing_args(request.args)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    if not is_paginated(request.args):
+        tasks = database.load_tasks(identity_id=identity_id, **listing)
+        tasks_data = load_task_statuses(
+            status_poller, compute_client_for, identity_id, tasks
+        )
+        log.debug("task status is %s", tasks_data)
+        return jsonify(tasks_data)
+
+    limit = listing["limit"]
+    tasks = database.load_tasks(
+        identity_id=identity_id, **{**listing, "limit": limit + 1}
+    )
+    tasks, next_cursor = paginate(tasks, limit, "task_create_time", "task_id")
+    statuses = load_task_statuses(
+        status_poller, compute_client_for, identity_id, tasks
+    )
+    return jsonify(
+        {
+            "tasks": [
+                {
+                    "task_id": task["task_id"],
+                    "task_create_time": task["task_create_time"],
+                    **statuses[task["task_id"]],
+                }
+                for task in tasks
+            ],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@app.route("/api/task_log", methods=["GET"])
+@authenticated
+def diamond_task_log():
+    """Stream a byte range of a task's log from its endpoint.
+
+    Reads up to ``length`` bytes starting at ``offset`` through a small
+    remote function and streams them back. ``X-Log-Offset`` is the offset
+    to request next and ``X-Log-Size`` the current size of the log, so a
+    client following a running task only transfers the new bytes. A
+    ``X-Log-Truncated: true`` header means the log shrank and was re-read
+    from the start.
+    """
+    identity_id = session["primary_identity"]
+    task = database.load_task(identity_id, request.args.get("task_id"))
+    if task is None:
+        return jsonify({"message": "Task not found"}), 404
+    if not task["endpoint_id"] or not task["log_path"]:
+        return jsonify({"message": "Task has no log on record"}), 404
+
+    try:
+        offset = int(request.args.get("offset", 0))
+        length = int(request.args.get("length", LOG_TAIL_MAX_BYTES))
+    except ValueError:
+        return jsonify({"message": "offset and length must be integers"}), 400
+    if offset < 0 or not 1 <= length <= LOG_TAIL_MAX_BYTES:
+        message = f"offset must be >= 0 and length between 1 and {LOG_TAIL_MAX_BYTES}"
+        return jsonify({"message": message}), 400
+
+    # read with the client that submitted the task, which can reach its endpoint
+    globus_compute_client = compute_client_for(task["principal"])
+    function_id = function_registry.get_function_id(
+        globus_compute_client, log_tail_wrapper, task["principal"] or identity_id
+    )
+    # the wait below can take LOG_TAIL_TIMEOUT; do not hold a pool slot
+    database.release_db()
+    with span("run"):
+        tail_task_id = globus_compute_client.run(
+            log_path=task["log_path"],
+            offset=offset,
+            length=length,
+            endpoint_id=task["endpoint_id"],
+            function_id=function_id,
+        )
+    status = wait_for_task(globus_compute_client, tail_task_id, LOG_TAIL_TIMEOUT)
+    if status is None:
+        return jsonify({"message": "Timed out reading the log"}), 504
+    if status["status"] != "success":
+        message = status.get("exception", "Could not read the log")
+        return jsonify({"message": message}), 502
+
+    tail = status["result"]
+    data = tail["data"]
+
+    def generate():
+        for start in range(0, len(data), LOG_TAIL_CHUNK_BYTES):
+            yield data[start : start + LOG_TAIL_CHUNK_BYTES]
+
+    return Response(
+        generate(),
+        mimetype="text/plain",
+        headers={
+            "X-Log-Offset": str(tail["offset"]),
+            "X-Log-Size": str(tail["size"]),
+            "X-Log-Truncated": str(tail["truncated"]).lower(),
+            "Cache-Control": "no-cache",
+        },
+    )
+
+
+@app.route("/api/task_result", methods=["GET"])
+@authenticated
+def diamond_task_result():
+    """Result or exception of a finished task.
+
+    Served from the task's row, or from the result store for results too
+    large to keep in it. Globus Compute is only asked about a task the
+    database does not yet know to be finished.
+    """
+    identity_id = session["primary_identity"]
+    task_id = request.args.get("task_id")
+    task = database.load_task(identity_id, task_id)
+    if task is None:
+        return jsonify({"message": "Task not found"}), 404
+
+    output = result_store.get(task_id)
+    if output is not None:
+        return Response(output, mimetype="application/json")
+
+    if is_terminal(task["task_status"]):
+        status = status_from_record(task)
+    else:
+        # persists the finished status, offloading a large result
+        status = status_poller.lookup(
+            "task",
+            identity_id,
+            compute_client_for(task["principal"]),
+            [task_id],
+            task["principal"],
+        )[task_id]
+        if not is_terminal(status.get("status")):
+            message = "Task has not finished"
+            return jsonify({"message": message, "status": status.get("status")}), 409
+        output = result_store.get(task_id)
+    if output is None:
+        output = task_output(task_id, status)
+    return Response(output, mimetype="application/json")
 
 
 @app.route("/api/delete_task", methods=["POST"])
 @authenticated
 def diamond_delete_task():
     task_id = request.json.get("taskId")
+    if database.load_task(session["primary_identity"], task_id) is None:
+        return jsonify({"message": "Task not found"}), 404
+    # before the task_output row that names its result file goes away
+    result_store.forget(task_id)
     database.delete_task(task_id)
-    logging.info(f"task {task_id} deleted")
+    status_poller.forget(task_id)
+    log.info("task %s deleted", task_id)
     return jsonify({"message": "Task deleted successfully"})
 
 
+def format_event(event, data):
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.route("/api/status_stream", methods=["GET"])
+@authenticated
+def status_stream():
+    """Stream task and container status changes as server-sent events.
+
+    A ``snapshot`` event with every task and container is sent on connect,
+    followed by ``task`` and ``container`` events carrying only the status
+    changes the background poller observes for this identity.
+    """
+    if not status_poller.enabled:
+        message = "Status streaming requires the status poller"
+        return jsonify({"message": message}), 503
+
+    identity_id = session["primary_identity"]
+    subscription = status_poller.subscribe(identity_id)
+    try:
+        snapshot = {
+            "tasks": load_task_statuses(
+                status_poller,
+                compute_client_for,
+                identity_id,
+                database.load_tasks(identity_id=identity_id),
+            ),
+            "containers": load_containers_data(identity_id),
+        }
+    except Exception:
+        status_poller.unsubscribe(subscription)
+        raise
+    # the stream can stay open for hours; do not hold a pooled connection
+    database.release_db()
+
+    # last status sent per ID, so only real changes go out after the snapshot
+    sent = {
+        task_id: status["status"] for task_id, status in snapshot["tasks"].items()
+    }
+    sent.update(
+        (container["container_task_id"], container["status"])
+        for container in snapshot["containers"].values()
+    )
+
+    def generate():
+        try:
+            yield format_event("snapshot", snapshot)
+            while not subscription.overflowed:
+                try:
+                    event = subscription.events.get(timeout=STATUS_STREAM_HEARTBEAT)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if sent.get(event["id"]) == event["status"].get("status"):
+                    continue
+                sent[event["id"]] = event["status"].get("status")
+                yield format_event(event["kind"], event)
+            # the client fell behind; closing makes it reconnect for a snapshot
+            log.info("Status stream for %s overflowed, closing", identity_id)
+        finally:
+            status_poller.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/api/logout", methods=["GET"])
 @authenticated
 def logout():
@@ -237,7 +582,7 @@ def logout():
     - Remove cookies containing 'tokens'.
     - Redirect the user to the Globus Auth logout page.
     """
-    client = load_portal_client()
+    client = get_portal_client()
 
     # Revoke the tokens with Globus Auth
     for token, token_type in (
@@ -258,7 +603,7 @@ def logout():
     response = make_response(redirect(url_for("home", _external=True)))
     response.delete_cookie("tokens")
 
-    log.info(f"Session after clearing: {session}")
+    log.debug("Session after clearing: %s", session)
 
     redirect_uri = url_for("home", _external=True)
 
@@ -273,6 +618,27 @@ def logout():
     return response
 
 
+def remember_profile(profile):
+    """Keep a loaded profile in the session so later requests skip SQLite."""
+    name, email, institution = profile
+    session.update(
+        name=name, email=email, institution=institution, profile_loaded=True
+    )
+
+
+def logged_in_response():
+    """Send the user to the frontend with the login cookies set."""
+    response = make_response(redirect(f"{HOST}"))
+    response.set_cookie("is_authenticated", "true")
+    response.set_cookie("primary_username", session["primary_username"])
+    response.set_cookie("primary_identity", session["primary_identity"])
+    response.set_cookie("name", session["name"])
+    response.set_cookie("email", session["email"])
+    response.set_cookie("institution", session["institution"])
+    response.set_cookie("tokens", str(session["tokens"]))
+    return response
+
+
 @app.route("/api/profile", methods=["GET", "POST"])
 @authenticated
 def profile():
@@ -280,22 +646,21 @@ def profile():
     log.info("profile route")
     if request.method == "GET":
         identity_id = session.get("primary_identity")
-        profile = database.load_profile(identity_id)
-        log.info(f"Profile: {profile}")
+        if session.get("profile_loaded"):
+            profile = (session["name"], session["email"], session["institution"])
+        else:
+            profile = database.load_profile(identity_id)
+        log.debug("Profile: %s", profile)
 
         if profile:
-            name, email, institution = profile
-
-            session["name"] = name
-            session["email"] = email
-            session["institution"] = institution
+            remember_profile(profile)
         else:
             flash("Please complete any missing profile fields and press Save.")
 
         if request.args.get("next"):
             session["next"] = get_safe_redirect()
 
-        log.info(f"Session: {session}")
+        log.debug("Session: %s", session)
 
         if not profile and session.get("is_authenticated") == True:
             identity_id = session["primary_identity"]
@@ -308,6 +673,7 @@ def profile():
                 email=email,
                 institution=institution,
             )
+            session["profile_loaded"] = True
 
             flash("Thank you! Your profile has been successfully updated.")
             return redirect(url_for("profile"))
@@ -320,15 +686,7 @@ def profile():
         # )
         # return render_template("profile.jinja2")
         # Redirect to localhost:3000/profile
-        response = make_response(redirect(f"{HOST}"))
-        response.set_cookie("is_authenticated", "true")
-        response.set_cookie("primary_username", session["primary_username"])
-        response.set_cookie("primary_identity", session["primary_identity"])
-        response.set_cookie("name", session["name"])
-        response.set_cookie("email", session["email"])
-        response.set_cookie("institution", session["institution"])
-        response.set_cookie("tokens", str(session["tokens"]))
-        return response
+        return logged_in_response()
     elif request.method == "POST":
         name = session["name"] = request.form["name"]
         email = session["email"] = request.form["email"]
@@ -339,6 +697,7 @@ def profile():
             email=email,
             institution=institution,
         )
+        session["profile_loaded"] = True
 
         flash("Thank you! Your profile has been successfully updated.")
 
@@ -402,36 +761,16 @@ def authcallback():
             primary_identity=id_token.get("sub"),
         )
 
-        profile = database.load_profile(session["primary_identity"])
-
-        if profile:
-            name, email, institution = profile
-
-            session["name"] = name
-            session["email"] = email
-            session["institution"] = institution
-            log.info("profile found redirecting to profile... GET")
-            return redirect(url_for("profile"))
-        else:
-            log.info("profile not found, creating...")
-
-            # Create a mock form with the necessary data
-            form_data = {
-                "name": session["name"],
-                "email": session["email"],
-                "institution": session["institution"],
-                "identity_id": session["primary_identity"],
-            }
-
-            # Send a POST request to the profile creation endpoint
-            response = requests.post(url_for("profile", _external=True), json=form_data)
-
-            log.info("POST profile call done, redirecting to profile... GET")
-            if response.status_code == 200:
-                return redirect(url_for("profile"))
-            else:
-                log.error("Failed to create profile")
-                return "Error creating profile", 500
+        # create the profile on first login and finish in this one response
+        profile = database.ensure_profile(
+            session["primary_identity"],
+            name=session["name"],
+            email=session["email"],
+            institution=session["institution"],
+        )
+        remember_profile(profile)
+        log.info("Logged in %s", session["primary_identity"])
+        return logged_in_response()
 
 
 @app.route("/api/loadprofile", methods=["GET"])
@@ -1,37 +1,18 @@
-import json
-from http.server import BaseHTTPRequestHandler
+from api.backend import submission_engine
+from api.backend.utils.service import service_handler
 
-from diamond.wrapper.wrapper import register_container
 
+def register_container(client, identity_id, data, principal=None):
+    # accept the diamond SDK's names for the image file and its directory
+    data = {
+        **data,
+        "name": data.get("name") or data.get("image_file_name"),
+        "location": data.get("location") or data.get("work_path"),
+    }
+    return submission_engine.register_container(
+        client, identity_id, data, principal=principal
+    )
 
-class handler(BaseHTTPRequestHandler):
 
-    def do_POST(self):
-        content_length = int(self.headers["Content-Length"])
-        post_data = self.rfile.read(content_length)
-        data = json.loads(post_data.decode("utf-8"))
-
-        # Extract parameters from the request
-        base_image = data["base_image"]
-        image_file_name = data["image_file_name"]
-        endpoint = data["endpoint"]
-        work_path = data["work_path"]
-
-        # Call the SDK function
-        # result = sdk_register_container(base_image, image_file_name, endpoint, work_path)
-        # register_container(endpoint_id: str,work_path: str,image_file_name: str,base_image: str)
-        result = register_container(endpoint, work_path, image_file_name, base_image)
-
-        # testing with qdrant client pip package
-        # qdrant_url = os.getenv('QDRANT_URL', "localhost")
-        # qdrant_port = os.getenv('QDRANT_PORT', "6333")
-        # qdrant_client = QdrantClient(url=qdrant_url, port=qdrant_port, timeout=300)
-        # collection_name = os.getenv('QDRANT_COLLECTION_NAME', "collection")
-        # result = qdrant_client.collection_exists(collection_name)
-        # print(f"Collection {collection_name} exists: {result}")
-
-        self.send_response(200, result)
-        self.send_header("Content-type", "application/json")
-        self.end_headers()
-        response = {"message": "Container registered successfully", "result": result}
-        self.wfile.write(json.dumps(response).encode("utf-8"))
+# endpoint, base_image, name (or image_file_name) and location (or work_path)
+handler = service_handler(register_container, "Container registration submitted")
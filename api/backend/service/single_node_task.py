@@ -1,27 +1,7 @@
-import json
-from http.server import BaseHTTPRequestHandler
+from api.backend import submission_engine
+from api.backend.utils.service import service_handler
 
-
-class handler(BaseHTTPRequestHandler):
-
-    def do_POST(self):
-        content_length = int(self.headers["Content-Length"])
-        post_data = self.rfile.read(content_length)
-        data = json.loads(post_data.decode("utf-8"))
-
-        # Extract parameters from the request
-        endpoint = data["endpoint"]
-        container_id = data["container_id"]
-        task = data["task"]
-
-        # Call the SDK function
-        # result = sdk_single_node_task(endpoint, container_id, task)
-
-        self.send_response(200)
-        self.send_header("Content-type", "application/json")
-        self.end_headers()
-        response = {
-            "message": "Single node task executed successfully",
-            # "result": result
-        }
-        self.wfile.write(json.dumps(response).encode("utf-8"))
+# endpoint, task, and optionally container_id or container_path and log_path
+handler = service_handler(
+    submission_engine.submit_task, "Single node task submitted successfully"
+)
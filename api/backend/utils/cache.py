@@ -0,0 +1,164 @@
+"""In-process caches shared across request threads."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# create log object with current module name
+log = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidateCache:
+    """Bounded TTL cache that serves stale values while refreshing them.
+
+    A value younger than ``ttl`` is returned as is. A value older than
+    ``ttl`` but younger than ``ttl + max_stale`` is returned immediately
+    while a single background refresh per key recomputes it. Anything older
+    is recomputed synchronously. At most ``max_entries`` keys are kept,
+    evicting the least recently used.
+    """
+
+    def __init__(self, ttl, max_stale, max_entries=1024, refresh_workers=2):
+        """Constructor."""
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (value, time stored)
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=refresh_workers, thread_name_prefix="cache-refresh"
+        )
+
+    def get(self, key, loader):
+        """Return the value for ``key``, calling ``loader()`` when needed."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    return value
+                if age < self.ttl + self.max_stale:
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        self._executor.submit(self._refresh, key, loader)
+                    return value
+
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used key if full."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Drop a key."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _refresh(self, key, loader):
+        """Recompute a stale value in the background."""
+        try:
+            self.set(key, loader())
+        except Exception as e:
+            log.error("Error refreshing cached value for %s: %s", key, e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+class ByteLRUCache:
+    """Thread-safe LRU of byte strings bounded by their total size.
+
+    Values larger than a quarter of ``max_bytes`` are not cached, so one
+    large item cannot flush everything else.
+    """
+
+    def __init__(self, max_bytes):
+        """Constructor."""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Return the cached value, or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Cache a value, evicting least recently used ones to stay in budget."""
+        if len(value) > self.max_bytes // 4:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def invalidate(self, key):
+        """Drop a key."""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+
+
+class ExpiringLRUCache:
+    """Thread-safe LRU whose entries expire at a wall-clock time.
+
+    Each value is stored with its own ``expires_at`` in epoch seconds, such
+    as the expiry of the token it was derived from. At most ``max_entries``
+    keys are kept, evicting the least recently used.
+    """
+
+    def __init__(self, max_entries):
+        """Constructor."""
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (value, expires_at)
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        """Cache a value until ``expires_at``."""
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Drop a key."""
+        with self._lock:
+            self._entries.pop(key, None)
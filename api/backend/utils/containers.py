@@ -0,0 +1,107 @@
+"""Reuse container images already pulled on an endpoint."""
+
+import logging
+import threading
+from datetime import datetime
+
+# create log object with current module name
+log = logging.getLogger(__name__)
+
+
+def image_reference(base_image):
+    """Normalize an image URI so equivalent references share one index key.
+
+    Docker references without a tag or digest get ``:latest``, as
+    ``apptainer pull`` would. References pinned by digest are kept as-is.
+    """
+    reference = base_image.strip()
+    if reference.startswith("docker://") and "@" not in reference:
+        repository = reference[len("docker://") :]
+        if ":" not in repository.rsplit("/", 1)[-1]:
+            reference += ":latest"
+    return reference
+
+
+class ContainerImageIndex:
+    """Index of built images keyed by endpoint, image reference and location.
+
+    A request for an image that is already built at the same location on
+    the same endpoint reuses it, and one from the principal whose build is
+    still running attaches to that build instead of starting another pull.
+    Another principal's running build is never attached to, since only
+    the client that started it can poll it; failed builds are retried.
+    """
+
+    def __init__(self, database):
+        """Constructor."""
+        self.database = database
+        self._lock = threading.Lock()
+        # index key -> lock serializing lookup and build of that image only
+        self._key_locks = {}
+
+    def key_lock(self, key):
+        """Return the lock for one index key."""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get_or_build(
+        self,
+        principal,
+        endpoint_id,
+        base_image,
+        location,
+        image_path,
+        build,
+        rebuild=False,
+    ):
+        """Return the image row to use, calling ``build()`` only on a miss.
+
+        ``build`` starts the pull with ``principal``'s client, the user's
+        identity ID or the service principal, and returns its task ID. The
+        returned dict has ``build_task_id``, ``image_path``,
+        ``image_status`` and ``cache_hit``.
+        """
+        reference = image_reference(base_image)
+        # concurrent requests for the same image share one pull, while
+        # requests for other images go ahead without waiting on it
+        with self.key_lock((endpoint_id, reference, location)):
+            image = self.database.load_container_image(
+                endpoint_id, reference, location
+            )
+            if image is not None and not rebuild and (
+                image["image_status"] == "success"
+                or (
+                    image["image_status"] != "failed"
+                    and image["identity_id"] == principal
+                )
+            ):
+                log.info(
+                    "Reusing build %s of %s at %s on endpoint %s",
+                    image["build_task_id"],
+                    reference,
+                    location,
+                    endpoint_id,
+                )
+                return {
+                    "build_task_id": image["build_task_id"],
+                    "image_path": image["image_path"],
+                    "image_status": image["image_status"],
+                    "cache_hit": True,
+                }
+
+            build_task_id = build()
+            self.database.save_container_image(
+                endpoint_id=endpoint_id,
+                base_image=reference,
+                location=location,
+                image_path=image_path,
+                build_task_id=build_task_id,
+                identity_id=principal,
+                created_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            )
+        return {
+            "build_task_id": build_task_id,
+            "image_path": image_path,
+            "image_status": None,
+            "cache_hit": False,
+        }
@@ -2,38 +2,159 @@
 
 import logging
 import os
+import queue
 import sqlite3
+import threading
+import time
 
-from flask import g
+from flask import g, has_app_context
+
+from api.backend.utils.metrics import span
 
-# create and configure logger
-logging.basicConfig(
-    level=logging.INFO,
-    datefmt="%Y-%m-%dT%H:%M:%S",
-    format="%(asctime)-15s.%(msecs)03dZ %(levelname)-7s : %(name)s - %(message)s",
-)
 # create log object with current module name
 log = logging.getLogger(__name__)
 
 
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections shared by request threads.
+
+    Connections are created lazily up to ``size`` and handed out most
+    recently used first. A connection idle for longer than
+    ``health_check_interval`` seconds is checked with ``SELECT 1`` before
+    it is reused and replaced if the check fails.
+    """
+
+    def __init__(self, connect, size, timeout, health_check_interval):
+        """Constructor."""
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._lock = threading.Lock()
+        self._created = 0
+        # connection -> time it was returned to the pool
+        self._released_at = {}
+        self._idle = queue.LifoQueue()
+
+    def acquire(self):
+        """Check a connection out of the pool, waiting if all are in use."""
+        try:
+            db = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    return self.connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            try:
+                db = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise sqlite3.OperationalError(
+                    "Timed out waiting for a database connection"
+                ) from None
+
+        released_at = self._released_at.pop(db, 0)
+        if time.monotonic() - released_at > self.health_check_interval:
+            try:
+                db.execute("SELECT 1").fetchone()
+            except sqlite3.Error as e:
+                log.warning("Replacing unhealthy database connection: %s", e)
+                self.discard(db)
+                return self.acquire()
+        return db
+
+    def release(self, db):
+        """Return a connection, rolling back anything left uncommitted."""
+        try:
+            if db.in_transaction:
+                db.rollback()
+        except sqlite3.Error:
+            self.discard(db)
+            return
+        self._released_at[db] = time.monotonic()
+        self._idle.put(db)
+
+    def discard(self, db):
+        """Close a connection and free its slot."""
+        self._released_at.pop(db, None)
+        try:
+            db.close()
+        finally:
+            with self._lock:
+                self._created -= 1
+
+
 class Database:
     """Database access."""
 
     def __init__(self, app):
         """Constructor."""
         self.app = app
+        self.pool = ConnectionPool(
+            self.connect_to_db,
+            size=int(os.environ.get("DATABASE_POOL_SIZE", 16)),
+            timeout=float(os.environ.get("DATABASE_POOL_TIMEOUT", 30)),
+            health_check_interval=float(
+                os.environ.get("DATABASE_POOL_HEALTH_CHECK_INTERVAL", 30)
+            ),
+        )
 
         @app.teardown_appcontext
         def close_connection(exception):
-            """Close database connection when finished handling request."""
-            db = getattr(g, "_database", None)
-
-            if db is not None:
-                db.close()
+            """Return database connection to the pool after handling request."""
+            self.release_db()
 
     def ensure_tables_exist(self):
-        """Ensure all required tables are created."""
+        """Bring the schema up to date, one versioned migration at a time.
+
+        The applied version is tracked in ``PRAGMA user_version``. Each
+        migration runs in its own immediate transaction, so concurrent
+        workers starting together apply it exactly once.
+        """
         db = self.get_db()
+        journal_mode = os.environ.get("DATABASE_JOURNAL_MODE", "WAL")
+        db.execute(f"PRAGMA journal_mode = {journal_mode}")
+
+        for version, migration in enumerate(self.migrations(), start=1):
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                if db.execute("PRAGMA user_version").fetchone()[0] < version:
+                    log.info("Migrating database schema to version %d", version)
+                    migration(db)
+                    db.execute(f"PRAGMA user_version = {version}")
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+    def migrations(self):
+        """Schema migrations in the order they must be applied."""
+        return [
+            self.create_tables,
+            self.add_task_status_columns,
+            self.add_container_status_column,
+            self.create_function_registry,
+            self.add_task_group_column,
+            self.create_identity_indexes,
+            self.add_container_create_time,
+            self.add_task_version,
+            self.add_task_location_columns,
+            self.create_task_output,
+            self.create_container_image_index,
+            self.create_task_version_counter,
+            self.add_container_image_owner,
+            self.add_submitting_principal,
+        ]
+
+    def create_tables(self, db):
+        """Version 1: the original profile, task and container tables."""
         db.execute(
             """
             CREATE TABLE IF NOT EXISTS profile (
@@ -68,35 +189,276 @@ class Database:
             )
             """
         )
-        db.commit()
+
+    def add_task_status_columns(self, db):
+        """Version 2: persisted task status, result and exception metadata."""
+        self.ensure_columns_exist(
+            db,
+            "task",
+            {
+                "task_result": "TEXT",
+                "task_exception": "TEXT",
+                "task_completion_time": "TEXT",
+                "task_details": "TEXT",
+            },
+        )
+
+    def add_container_status_column(self, db):
+        """Version 3: persisted container build status."""
+        self.ensure_columns_exist(db, "container", {"container_status": "TEXT"})
+
+    def create_function_registry(self, db):
+        """Version 4: registered Globus Compute function IDs."""
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS function_registry (
+                identity_id VARCHAR(255),
+                function_hash TEXT,
+                function_name TEXT,
+                function_id TEXT,
+                registered_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (identity_id, function_hash)
+            )
+            """
+        )
+
+    def add_task_group_column(self, db):
+        """Version 5: task group of tasks submitted as a job array."""
+        self.ensure_columns_exist(db, "task", {"task_group_id": "TEXT"})
+
+    def create_identity_indexes(self, db):
+        """Version 6: indexes for the per-identity listings."""
+        db.execute(
+            """CREATE INDEX IF NOT EXISTS task_identity_create_time
+            ON task (identity_id, task_create_time, task_id)"""
+        )
+        db.execute(
+            """CREATE INDEX IF NOT EXISTS container_identity
+            ON container (identity_id)"""
+        )
+
+    def add_container_create_time(self, db):
+        """Version 7: container creation time for keyset pagination.
+
+        Containers saved before this have no recorded time; they get the
+        epoch so they sort after everything created since.
+        """
+        self.ensure_columns_exist(
+            db, "container", {"container_create_time": "TIMESTAMP"}
+        )
+        db.execute(
+            """UPDATE container SET container_create_time = '1970-01-01 00:00:00'
+            WHERE container_create_time IS NULL"""
+        )
+        db.execute("DROP INDEX IF EXISTS container_identity")
+        db.execute(
+            """CREATE INDEX IF NOT EXISTS container_identity_create_time
+            ON container (identity_id, container_create_time, container_task_id)"""
+        )
+
+    def add_task_version(self, db):
+        """Version 8: per-identity change counter for incremental sync."""
+        self.ensure_columns_exist(db, "task", {"task_version": "INTEGER"})
+        db.execute("UPDATE task SET task_version = rowid WHERE task_version IS NULL")
+        db.execute(
+            """CREATE INDEX IF NOT EXISTS task_identity_version
+            ON task (identity_id, task_version)"""
+        )
+
+    def add_task_location_columns(self, db):
+        """Version 9: where a task ran and where it writes its log."""
+        self.ensure_columns_exist(
+            db, "task", {"endpoint_id": "TEXT", "log_path": "TEXT"}
+        )
+
+    def create_task_output(self, db):
+        """Version 10: compressed results and exceptions of finished tasks."""
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS task_output (
+                task_id TEXT PRIMARY KEY,
+                encoding TEXT,
+                size INTEGER,
+                payload BLOB,
+                blob_path TEXT,
+                FOREIGN KEY (task_id) REFERENCES task(task_id)
+            )
+            """
+        )
+
+    def create_container_image_index(self, db):
+        """Version 11: built images shared by containers with the same source.
+
+        Every container now points at the build that produced its image,
+        which is its own task for containers saved before this.
+        """
+        self.ensure_columns_exist(
+            db,
+            "container",
+            {
+                "endpoint_id": "TEXT",
+                "build_task_id": "TEXT",
+                "image_path": "TEXT",
+                "cache_hit": "INTEGER DEFAULT 0",
+            },
+        )
+        db.execute(
+            """UPDATE container SET build_task_id = container_task_id,
+            image_path = location || '/' || name
+            WHERE build_task_id IS NULL"""
+        )
+        db.execute(
+            """CREATE INDEX IF NOT EXISTS container_build
+            ON container (build_task_id)"""
+        )
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS container_image (
+                endpoint_id TEXT,
+                base_image TEXT,
+                location TEXT,
+                image_path TEXT,
+                build_task_id TEXT,
+                image_status TEXT,
+                created_time TIMESTAMP,
+                PRIMARY KEY (endpoint_id, base_image, location)
+            )
+            """
+        )
+        db.execute(
+            """CREATE INDEX IF NOT EXISTS container_image_build
+            ON container_image (build_task_id)"""
+        )
+
+    def create_task_version_counter(self, db):
+        """Version 12: persisted per-identity task change counter.
+
+        ``task_version`` used to be the identity's highest version plus one,
+        which handed a deleted task's version to the next change. Triggers
+        now take every new version from a counter that never goes back, in
+        the same transaction as the insert or status change.
+        """
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS task_version_counter (
+                identity_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+            """
+        )
+        db.execute(
+            """INSERT OR IGNORE INTO task_version_counter (identity_id, version)
+            SELECT identity_id, MAX(task_version) FROM task
+            WHERE identity_id IS NOT NULL GROUP BY identity_id"""
+        )
+        bump_version = """
+            INSERT INTO task_version_counter (identity_id, version)
+            VALUES (NEW.identity_id, 1)
+            ON CONFLICT(identity_id) DO UPDATE SET version = version + 1;
+            UPDATE task SET task_version = (
+                SELECT version FROM task_version_counter
+                WHERE identity_id = NEW.identity_id
+            ) WHERE rowid = NEW.rowid;
+        """
+        db.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS task_version_insert
+            AFTER INSERT ON task WHEN NEW.identity_id IS NOT NULL
+            BEGIN {bump_version} END"""
+        )
+        db.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS task_version_update
+            AFTER UPDATE OF task_status ON task
+            WHEN NEW.identity_id IS NOT NULL
+            AND OLD.task_status IS NOT NEW.task_status
+            BEGIN {bump_version} END"""
+        )
+
+    def add_container_image_owner(self, db):
+        """Version 13: the identity whose client started each indexed build."""
+        self.ensure_columns_exist(db, "container_image", {"identity_id": "TEXT"})
+        db.execute(
+            """UPDATE container_image SET identity_id = (
+                SELECT container.identity_id FROM container
+                WHERE container.container_task_id = container_image.build_task_id
+            ) WHERE identity_id IS NULL"""
+        )
+
+    def add_submitting_principal(self, db):
+        """Version 14: who submitted tasks and builds made for someone else.
+
+        NULL means the owning identity's own client; otherwise it is the
+        principal, such as the service client, whose client must poll them.
+        The function registry and image index store principals in their
+        ``identity_id`` columns the same way.
+        """
+        self.ensure_columns_exist(db, "task", {"principal": "TEXT"})
+        self.ensure_columns_exist(db, "container", {"principal": "TEXT"})
+
+    def ensure_columns_exist(self, db, table, columns):
+        """Add any of the given columns missing from a table created earlier."""
+        existing = {row[1] for row in db.execute(f"PRAGMA table_info({table})")}
+        for column, column_type in columns.items():
+            if column not in existing:
+                log.info("Adding column %s to table %s", column, table)
+                db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
 
     def connect_to_db(self):
-        """Open database and return a connection handle."""
-        return sqlite3.connect(os.environ["DATABASE"])
+        """Open database and return a connection handle.
+
+        Connections wait up to ``DATABASE_BUSY_TIMEOUT`` milliseconds for a
+        lock and keep a per-connection cache of prepared statements. They
+        are pooled, so the PRAGMAs set here are applied once per connection.
+        """
+        busy_timeout = int(os.environ.get("DATABASE_BUSY_TIMEOUT", 5000))
+        db = sqlite3.connect(
+            os.environ["DATABASE"],
+            timeout=busy_timeout / 1000,
+            cached_statements=256,
+            check_same_thread=False,
+        )
+        db.row_factory = sqlite3.Row
+        db.execute(
+            f"PRAGMA synchronous = {os.environ.get('DATABASE_SYNCHRONOUS', 'NORMAL')}"
+        )
+        return db
 
     def get_db(self):
-        """Return the app global db connection or create one."""
+        """Return the app global db connection or check one out of the pool."""
         db = getattr(g, "_database", None)
 
         if db is None:
-            db = g._database = self.connect_to_db()
-            db.row_factory = sqlite3.Row
+            with span("db_pool_wait"):
+                db = g._database = self.pool.acquire()
 
         return db
 
+    def release_db(self):
+        """Return the app global db connection to the pool, if any.
+
+        Call it before remote I/O too, so a request waiting on Globus does
+        not hold a pool slot; the next query checks a connection out again.
+        """
+        if not has_app_context():
+            return
+        db = g.pop("_database", None)
+
+        if db is not None:
+            self.pool.release(db)
+
     def query_db(self, query, args=(), one=False):
         """Query the database."""
-        log.info(f"Querying database: {query}")
-        cur = self.get_db().execute(query, args)
-
-        rv = cur.fetchall()
-        cur.close()
+        log.debug("Querying database: %s", query)
+        db = self.get_db()
+        with span("db"):
+            cur = db.execute(query, args)
+            rv = cur.fetchall()
+            cur.close()
 
         return (rv[0] if rv else None) if one else rv
 
     def save_profile(self, identity_id=None, name=None, email=None, institution=None):
         """Persist user profile."""
-        log.info(f"Saving profile: {name}, {email}, {institution}")
+        log.info("Saving profile: %s, %s, %s", name, email, institution)
         db = self.get_db()
         # Ensure the data types are correct, convert if necessary
 
@@ -114,9 +476,25 @@ class Database:
         )
         db.commit()
 
+    def ensure_profile(self, identity_id, name=None, email=None, institution=None):
+        """Create the profile if it is missing and return the stored one.
+
+        An existing profile keeps the values the user saved; the arguments
+        only fill in a new one.
+        """
+        db = self.get_db()
+        db.execute(
+            """INSERT INTO profile (identity_id, name, email, institution)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(identity_id) DO NOTHING""",
+            (identity_id, name, email, institution),
+        )
+        db.commit()
+        return self.load_profile(identity_id)
+
     def load_profile(self, identity_id):
         """Load user profile."""
-        log.info(f"Loading profile: {identity_id}")
+        log.debug("Loading profile: %s", identity_id)
         return self.query_db(
             """select name, email, institution from profile
 														 where identity_id = ?""",
@@ -124,43 +502,221 @@ class Database:
             one=True,
         )
     
-    def save_task(self, task_id = None, identity_id=None, task_status=None, task_create_time=None):
+    def save_task(
+        self,
+        task_id=None,
+        identity_id=None,
+        task_status=None,
+        task_create_time=None,
+        endpoint_id=None,
+        log_path=None,
+    ):
         """Persist task information."""
-        log.info(f"Saving task: {task_id}, {identity_id}")
+        log.info("Saving task: %s, %s", task_id, identity_id)
         db = self.get_db()
 
         identity_id = str(identity_id) if identity_id is not None else None
         task_id = str(task_id) if task_id is not None else None
         task_status = str(task_status) if task_status is not None else None
         task_create_time = str(task_create_time) if task_create_time is not None else None
+        endpoint_id = str(endpoint_id) if endpoint_id is not None else None
+        log_path = str(log_path) if log_path is not None else None
 
         db.execute(
-            """INSERT INTO task (identity_id, task_id, task_status, task_create_time)
-            VALUES (?, ?, ?, ?)""",
-            (identity_id, task_id, task_status, task_create_time),
+            """INSERT INTO task (identity_id, task_id, task_status, task_create_time,
+            endpoint_id, log_path)
+            VALUES (?, ?, ?, ?, ?, ?)""",
+            (
+                identity_id,
+                task_id,
+                task_status,
+                task_create_time,
+                endpoint_id,
+                log_path,
+            ),
+        )
+        db.commit()
+
+    def save_tasks(self, tasks):
+        """Persist many new tasks in a single transaction.
+
+        ``tasks`` is an iterable of dicts with ``task_id``, ``identity_id``,
+        ``task_create_time``, ``task_group_id``, ``endpoint_id``,
+        ``log_path`` and ``principal`` keys.
+        """
+        tasks = list(tasks)
+        log.info("Saving %d tasks", len(tasks))
+        db = self.get_db()
+        db.executemany(
+            """INSERT INTO task (identity_id, task_id, task_create_time, task_group_id,
+            endpoint_id, log_path, principal)
+            VALUES (:identity_id, :task_id, :task_create_time, :task_group_id,
+            :endpoint_id, :log_path, :principal)""",
+            tasks,
+        )
+        db.commit()
+
+    def update_task_statuses(self, statuses):
+        """Persist status, result and exception metadata for many tasks.
+
+        ``statuses`` is an iterable of dicts keyed by the ``task`` column
+        names, written in a single transaction. Rows whose status actually
+        changes get the identity's next ``task_version`` from a trigger; the
+        others are left untouched.
+        """
+        statuses = list(statuses)
+        if not statuses:
+            return
+        log.info("Updating status of %d tasks", len(statuses))
+        db = self.get_db()
+        db.executemany(
+            """UPDATE task SET task_status = :task_status, task_result = :task_result,
+            task_exception = :task_exception,
+            task_completion_time = :task_completion_time,
+            task_details = :task_details
+            WHERE task_id = :task_id AND task_status IS NOT :task_status""",
+            statuses,
         )
         db.commit()
 
-    def load_tasks(self, identity_id):
-        """Load task data for a specific profile."""
-        log.info(f"Loading task data for identity_id: {identity_id}")
+    def load_tasks(
+        self,
+        identity_id,
+        status=None,
+        created_after=None,
+        created_before=None,
+        cursor=None,
+        limit=None,
+    ):
+        """Load task data for a specific profile, newest first.
+
+        See ``load_listing`` for the filter and keyset pagination arguments.
+        """
+        log.debug("Loading task data for identity_id: %s", identity_id)
+        return self.load_listing(
+            """SELECT task_id, task_status, task_create_time, task_result,
+            task_exception, task_completion_time, task_details, principal FROM task""",
+            "task_status",
+            "task_create_time",
+            "task_id",
+            identity_id,
+            status=status,
+            created_after=created_after,
+            created_before=created_before,
+            cursor=cursor,
+            limit=limit,
+        )
+
+    def load_tasks_changed_since(self, identity_id, version):
+        """Load tasks created or changed after a ``task_version``.
+
+        Rows come oldest change first. Deleted tasks are not reported.
+        """
+        log.debug("Loading tasks changed since %s for: %s", version, identity_id)
+        return self.query_db(
+            """SELECT task_id, task_status, task_create_time, task_result,
+            task_exception, task_completion_time, task_details, task_version,
+            principal FROM task
+            WHERE identity_id = ? AND task_version > ?
+            ORDER BY task_version""",
+            [identity_id, version],
+        )
+
+    def load_listing(
+        self,
+        select,
+        status_column,
+        time_column,
+        id_column,
+        identity_id,
+        status=None,
+        created_after=None,
+        created_before=None,
+        cursor=None,
+        limit=None,
+    ):
+        """Run a per-identity listing query ordered by creation time, newest first.
+
+        ``status`` matches the persisted status exactly, except ``pending``
+        which matches anything not yet in a terminal state. ``cursor`` is the
+        ``(create_time, id)`` of the last row of the previous page; rows
+        after it are read straight off the identity index.
+        """
+        where = ["identity_id = ?"]
+        args = [identity_id]
+        if status == "pending":
+            where.append(
+                f"({status_column} IS NULL"
+                f" OR {status_column} NOT IN ('success', 'failed'))"
+            )
+        elif status is not None:
+            where.append(f"{status_column} = ?")
+            args.append(status)
+        if created_after is not None:
+            where.append(f"{time_column} >= ?")
+            args.append(created_after)
+        if created_before is not None:
+            where.append(f"{time_column} < ?")
+            args.append(created_before)
+        if cursor is not None:
+            where.append(f"({time_column}, {id_column}) < (?, ?)")
+            args.extend(cursor)
+
+        query = f"""{select}
+            WHERE {" AND ".join(where)}
+            ORDER BY {time_column} DESC, {id_column} DESC"""
+        if limit is not None:
+            query += " LIMIT ?"
+            args.append(limit)
+        return self.query_db(query, args)
+
+    def load_task(self, identity_id, task_id):
+        """Load one task owned by a specific profile."""
         return self.query_db(
-            """SELECT task_id, task_status, task_create_time FROM task
-            WHERE identity_id = ?""",
-            [identity_id]
+            """SELECT task_id, task_status, task_create_time, endpoint_id, log_path,
+            task_result, task_exception, task_completion_time, task_details,
+            principal FROM task WHERE identity_id = ? AND task_id = ?""",
+            [identity_id, task_id],
+            one=True,
         )
 
     def delete_task(self, task_id):
         """Delete a task."""
-        log.info(f"Deleting task: {task_id}")
+        log.info("Deleting task: %s", task_id)
         db = self.get_db()
         db.execute(
             """DELETE FROM task
             WHERE task_id = ?""",
             [task_id]
         )
+        db.execute("DELETE FROM task_output WHERE task_id = ?", [task_id])
         db.commit()
 
+    def save_task_output(
+        self, task_id=None, encoding=None, size=None, payload=None, blob_path=None
+    ):
+        """Persist a finished task's output, inline or as a sidecar file path."""
+        log.info("Saving output of task %s: %d bytes", task_id, size)
+        db = self.get_db()
+        db.execute(
+            """INSERT INTO task_output (task_id, encoding, size, payload, blob_path)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(task_id) DO UPDATE SET
+            encoding = excluded.encoding, size = excluded.size,
+            payload = excluded.payload, blob_path = excluded.blob_path""",
+            (task_id, encoding, size, payload, blob_path),
+        )
+        db.commit()
+
+    def load_task_output(self, task_id):
+        """Load a finished task's stored output."""
+        return self.query_db(
+            """SELECT encoding, size, payload, blob_path FROM task_output
+            WHERE task_id = ?""",
+            [task_id],
+            one=True,
+        )
+
 
     def save_container(
         self,
@@ -170,9 +726,22 @@ class Database:
         name=None,
         location=None,
         description=None,
+        container_create_time=None,
+        endpoint_id=None,
+        build_task_id=None,
+        image_path=None,
+        cache_hit=False,
+        container_status=None,
+        principal=None,
     ):
-        """Persist container information."""
-        log.info(f"Saving task: {container_task_id}, {identity_id}")
+        """Persist container information.
+
+        ``build_task_id`` is the build that produces the image; it defaults
+        to the container's own task. ``cache_hit`` marks containers that
+        reused an image built earlier. ``principal`` is set when another
+        principal's client runs the build.
+        """
+        log.info("Saving container: %s, %s", container_task_id, identity_id)
         db = self.get_db()
 
         identity_id = str(identity_id) if identity_id is not None else None
@@ -181,26 +750,155 @@ class Database:
         name = str(name) if name is not None else None
         location = str(location) if location is not None else None
         description = str(description) if description is not None else None
+        container_create_time = (
+            str(container_create_time) if container_create_time is not None else None
+        )
 
         db.execute(
-            """INSERT INTO container (identity_id, container_task_id, base_image, name, location, description)
-            VALUES (?, ?, ?, ?, ?, ?)""",
-            (identity_id, container_task_id, base_image, name, location, description),
+            """INSERT INTO container (identity_id, container_task_id, base_image, name, location, description,
+            container_create_time, endpoint_id, build_task_id, image_path, cache_hit,
+            container_status, principal)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                identity_id,
+                container_task_id,
+                base_image,
+                name,
+                location,
+                description,
+                container_create_time,
+                endpoint_id,
+                build_task_id or container_task_id,
+                image_path,
+                int(cache_hit),
+                container_status,
+                principal,
+            ),
+        )
+        db.commit()
+
+    def load_containers(
+        self,
+        identity_id,
+        status=None,
+        created_after=None,
+        created_before=None,
+        cursor=None,
+        limit=None,
+    ):
+        """Load container data for a specific profile, newest first.
+
+        See ``load_listing`` for the filter and keyset pagination arguments.
+        """
+        log.debug("Loading container data for identity_id: %s", identity_id)
+        return self.load_listing(
+            """SELECT container_task_id, base_image, name, location, description,
+            container_status, container_create_time, build_task_id, image_path,
+            cache_hit, principal FROM container""",
+            "container_status",
+            "container_create_time",
+            "container_task_id",
+            identity_id,
+            status=status,
+            created_after=created_after,
+            created_before=created_before,
+            cursor=cursor,
+            limit=limit,
+        )
+
+    def load_container(self, identity_id, container_task_id):
+        """Load one container owned by a specific profile."""
+        return self.query_db(
+            """SELECT container_task_id, base_image, name, location, image_path,
+            container_status FROM container
+            WHERE identity_id = ? AND container_task_id = ?""",
+            (identity_id, container_task_id),
+            one=True,
+        )
+
+    def update_container_statuses(self, statuses):
+        """Persist build status for many builds in a single transaction.
+
+        ``statuses`` is an iterable of ``(build_task_id, container_status)``.
+        The status is written to every container sharing the build and to
+        the indexed image it produced.
+        """
+        statuses = [
+            (status, build_task_id, status) for build_task_id, status in statuses
+        ]
+        if not statuses:
+            return
+        log.info("Updating status of %d container builds", len(statuses))
+        db = self.get_db()
+        db.executemany(
+            """UPDATE container SET container_status = ?
+            WHERE build_task_id = ? AND container_status IS NOT ?""",
+            statuses,
+        )
+        db.executemany(
+            """UPDATE container_image SET image_status = ?
+            WHERE build_task_id = ? AND image_status IS NOT ?""",
+            statuses,
         )
         db.commit()
 
-    def load_containers(self, identity_id):
-        """Load container data for a specific profile."""
-        log.info(f"Loading container data for identity_id: {identity_id}")
+    def load_build_containers(self, build_task_ids):
+        """Load the containers, and their owners, sharing any of the builds."""
+        build_task_ids = list(build_task_ids)
+        if not build_task_ids:
+            return []
+        placeholders = ", ".join("?" * len(build_task_ids))
         return self.query_db(
-            """SELECT container_task_id, base_image, name, location, description FROM container
-            WHERE identity_id = ?""",
-            [identity_id]
+            f"""SELECT build_task_id, container_task_id, identity_id FROM container
+            WHERE build_task_id IN ({placeholders})""",
+            build_task_ids,
         )
 
+    def load_container_image(self, endpoint_id, base_image, location):
+        """Load the indexed image built from a source at a location."""
+        return self.query_db(
+            """SELECT build_task_id, image_path, image_status, identity_id
+            FROM container_image WHERE endpoint_id = ? AND base_image = ? AND location = ?""",
+            (endpoint_id, base_image, location),
+            one=True,
+        )
+
+    def save_container_image(
+        self,
+        endpoint_id=None,
+        base_image=None,
+        location=None,
+        image_path=None,
+        build_task_id=None,
+        identity_id=None,
+        created_time=None,
+    ):
+        """Index a new build, replacing any earlier one of the same source.
+
+        ``identity_id`` is the identity whose client started the build.
+        """
+        log.info("Indexing image build %s of %s", build_task_id, base_image)
+        db = self.get_db()
+        db.execute(
+            """INSERT OR REPLACE INTO container_image (endpoint_id, base_image,
+            location, image_path, build_task_id, identity_id, image_status,
+            created_time)
+            VALUES (?, ?, ?, ?, ?, ?, NULL, ?)""",
+            (
+                endpoint_id,
+                base_image,
+                location,
+                image_path,
+                build_task_id,
+                identity_id,
+                created_time,
+            ),
+        )
+        db.commit()
+
     def delete_container(self, container_task_id):
         """Delete a container."""
-        log.info(f"Deleting container: {container_task_id}")
+        log.info("Deleting container: %s", container_task_id)
         db = self.get_db()
         db.execute(
             """DELETE FROM container
@@ -208,3 +906,29 @@ class Database:
             [container_task_id]
         )
         db.commit()
+
+    def save_function_id(
+        self, identity_id=None, function_hash=None, function_name=None, function_id=None
+    ):
+        """Persist a registered function ID."""
+        log.info("Saving function: %s, %s", function_name, function_id)
+        db = self.get_db()
+        db.execute(
+            """INSERT INTO function_registry
+            (identity_id, function_hash, function_name, function_id)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(identity_id, function_hash) DO UPDATE SET
+            function_name = excluded.function_name, function_id = excluded.function_id""",
+            (str(identity_id), function_hash, function_name, str(function_id)),
+        )
+        db.commit()
+
+    def load_function_id(self, identity_id, function_hash):
+        """Load the ID a function was registered under, if any."""
+        row = self.query_db(
+            """SELECT function_id FROM function_registry
+            WHERE identity_id = ? AND function_hash = ?""",
+            [identity_id, function_hash],
+            one=True,
+        )
+        return row["function_id"] if row else None
@@ -1,29 +1,89 @@
 import json
 import logging
+import os
+import time
 from functools import wraps
 
+import globus_sdk
 from flask import jsonify, redirect, request, session, url_for
 from werkzeug.datastructures import ImmutableMultiDict
 
+from api.backend.utils.cache import ExpiringLRUCache
 from api.backend.utils.errors import UnauthorizedError
-from api.backend.utils.utils import get_portal_tokens, load_portal_client
-
-# create and configure logger
-logging.basicConfig(
-    level=logging.INFO,
-    datefmt="%Y-%m-%dT%H:%M:%S",
-    format="%(asctime)-15s.%(msecs)03dZ %(levelname)-7s : %(name)s - %(message)s",
+from api.backend.utils.login_flow import cookie_key
+from api.backend.utils.utils import (
+    get_portal_client,
+    get_portal_tokens,
+    load_portal_client,
 )
+
 # create log object with current module name
 log = logging.getLogger(__name__)
 
+# is_authenticated outcomes, keyed by a hash of the tokens cookie
+introspection_cache = ExpiringLRUCache(
+    max_entries=int(os.environ.get("TOKEN_CACHE_SIZE", 1024))
+)
+IS_AUTHENTICATED_CACHE_TTL = float(os.environ.get("IS_AUTHENTICATED_CACHE_TTL", 60))
+
+# identities of introspected bearer tokens, keyed by a hash of the token
+bearer_token_cache = ExpiringLRUCache(
+    max_entries=int(os.environ.get("TOKEN_CACHE_SIZE", 1024))
+)
+
+
+def bearer_identity(authorization):
+    """Return the identity an ``Authorization: Bearer`` header authenticates.
+
+    The token is introspected with the portal client, so it must be one
+    issued for this portal. Returns None for a missing, malformed, expired
+    or revoked token. Outcomes are cached for up to
+    ``IS_AUTHENTICATED_CACHE_TTL`` seconds and never past the token's expiry.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    key = cookie_key(token.strip())
+    identity_id = bearer_token_cache.get(key)
+    if identity_id is not None:
+        return identity_id or None
+
+    now = time.time()
+    expires_at = now + IS_AUTHENTICATED_CACHE_TTL
+    try:
+        introspection = get_portal_client().oauth2_token_introspect(token.strip())
+    except globus_sdk.GlobusAPIError as e:
+        log.error("Error introspecting bearer token: %s", e)
+        return None
+    identity_id = ""
+    if introspection.get("active") and introspection.get("sub"):
+        identity_id = introspection["sub"]
+        expires_at = min(expires_at, introspection.get("exp") or expires_at)
+    # remember rejected tokens too, as the empty string
+    bearer_token_cache.set(key, identity_id, expires_at)
+    return identity_id or None
+
+
+def introspect_tokens(tokens):
+    """Return True if the tokens cookie holds any tokens."""
+    try:
+        tokens = json.loads(tokens)["value"]
+        log.debug("Tokens in is_authenticated: %s for route: %s", tokens, request.path)
+        if not tokens:
+            log.info("No tokens available")
+            return False
+    except json.JSONDecodeError as e:
+        log.error("Error decoding tokens: %s", e)
+        return False
+    return True
+
 
 def authenticated(fn):
     """Mark a route as requiring authentication."""
 
     @wraps(fn)
     def decorated_function(*args, **kwargs):
-        log.info(f"Checking authentication for route: {request.path}")
+        log.debug("Checking authentication for route: %s", request.path)
         # log.info(f"Request headers: {request.headers}")
         # log.info(f"Cookies: {request.cookies}")
         # log.info(f"Session: {session}")
@@ -49,20 +109,25 @@ def authenticated(fn):
         return fn(*args, **kwargs)
 
     def handle_is_authenticated(tokens: str):
-        """Handle the '/is_authenticated' endpoint with token introspection."""
+        """Handle the '/is_authenticated' endpoint with token introspection.
+
+        The outcome is cached per cookie value for a short while, since the
+        frontend asks on every navigation.
+        """
         if not tokens:
             log.info("No tokens found in request cookies")
             return jsonify({"is_authenticated": False}), 401
-        try:
-            tokens = json.loads(tokens)["value"]
-            log.debug(f"Tokens in is_authenticated: {tokens} for route: {request.path}")
-            if not tokens:
-                log.info("No tokens available")
-                return jsonify({"is_authenticated": False}), 401
-        except json.JSONDecodeError as e:
-            log.error(f"Error decoding tokens: {e}")
-            return jsonify({"is_authenticated": False}), 401
 
+        key = cookie_key(tokens)
+        is_authenticated = introspection_cache.get(key)
+        if is_authenticated is None:
+            is_authenticated = introspect_tokens(tokens)
+            introspection_cache.set(
+                key, is_authenticated, time.time() + IS_AUTHENTICATED_CACHE_TTL
+            )
+
+        if not is_authenticated:
+            return jsonify({"is_authenticated": False}), 401
         return jsonify({"is_authenticated": True})
 
     return decorated_function
@@ -0,0 +1,55 @@
+"""Discover the Globus Compute endpoints a user can submit to."""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from api.backend.utils.cache import StaleWhileRevalidateCache
+from api.backend.utils.log_config import sampled
+from api.backend.utils.metrics import span
+
+# create log object with current module name
+log = logging.getLogger(__name__)
+
+# bounded pool shared by every request probing endpoint status
+status_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("ENDPOINT_STATUS_WORKERS", 8)),
+    thread_name_prefix="endpoint-status",
+)
+
+active_endpoints_cache = StaleWhileRevalidateCache(
+    ttl=float(os.environ.get("ENDPOINT_CACHE_TTL", 30)),
+    max_stale=float(os.environ.get("ENDPOINT_CACHE_MAX_STALE", 300)),
+)
+
+
+def get_endpoint_status(client, endpoint_uuid):
+    """Return an endpoint's status, treating a failed probe as offline."""
+    try:
+        with span("get_endpoint_status"):
+            return client.get_endpoint_status(endpoint_uuid=endpoint_uuid)["status"]
+    except Exception as e:
+        if sampled():
+            log.error("Error fetching status for endpoint %s: %s", endpoint_uuid, e)
+        return "offline"
+
+
+def find_active_endpoints(client):
+    """Probe every visible endpoint concurrently and keep the online ones."""
+    with span("get_endpoints"):
+        endpoints = list(client.get_endpoints())
+    statuses = status_executor.map(
+        lambda endpoint: get_endpoint_status(client, endpoint["uuid"]), endpoints
+    )
+    return [
+        {"endpoint_name": endpoint["name"], "endpoint_uuid": endpoint["uuid"]}
+        for endpoint, status in zip(endpoints, statuses)
+        if status == "online"
+    ]
+
+
+def list_active_endpoints(identity_id, client):
+    """Return the identity's online endpoints, cached per identity."""
+    return active_endpoints_cache.get(
+        identity_id, lambda: find_active_endpoints(client)
+    )
@@ -0,0 +1,82 @@
+"""Reuse Globus Compute function registrations."""
+
+import hashlib
+import logging
+import threading
+
+from api.backend.utils.metrics import span
+
+# create log object with current module name
+log = logging.getLogger(__name__)
+
+
+class FunctionRegistry:
+    """Cache of registered function IDs, persisted in the database.
+
+    Registrations are keyed by principal and a hash of the serialized
+    function, so editing a wrapper's source yields a new hash and the
+    function is registered again on its next use.
+    """
+
+    def __init__(self, database):
+        """Constructor."""
+        self.database = database
+        self._lock = threading.Lock()
+        # function -> hash of its serialized body
+        self._hashes = {}
+        # (principal, function_hash) -> function_id
+        self._function_ids = {}
+        # (principal, function_hash) -> lock serializing its registration
+        self._key_locks = {}
+
+    def key_lock(self, key):
+        """Return the lock for one registration key."""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def function_hash(self, client, function):
+        """Return a hash of the function as the client would serialize it."""
+        function_hash = self._hashes.get(function)
+        if function_hash is None:
+            serialized = client.fx_serializer.serialize(function)
+            function_hash = hashlib.sha256(serialized.encode()).hexdigest()
+            self._hashes[function] = function_hash
+        return function_hash
+
+    def get_function_id(self, client, function, principal):
+        """Return the function's ID, registering it only on a cache miss.
+
+        ``principal`` owns ``client``: the user's identity ID for their own
+        client, or the service principal. Only functions that principal
+        registered are returned, since no other client may run them.
+        Concurrent misses for the same key register the function once.
+        """
+        function_hash = self.function_hash(client, function)
+        key = (principal, function_hash)
+
+        function_id = self._function_ids.get(key)
+        if function_id is not None:
+            return function_id
+
+        with self.key_lock(key):
+            # another request may have registered it while this one waited
+            function_id = self._function_ids.get(key)
+            if function_id is not None:
+                return function_id
+
+            function_id = self.database.load_function_id(principal, function_hash)
+            if function_id is None:
+                self.database.release_db()
+                with span("register_function"):
+                    function_id = client.register_function(function)
+                log.info("Registered %s as %s", function.__name__, function_id)
+                self.database.save_function_id(
+                    identity_id=principal,
+                    function_hash=function_hash,
+                    function_name=function.__name__,
+                    function_id=function_id,
+                )
+
+            with self._lock:
+                self._function_ids[key] = function_id
+        return function_id
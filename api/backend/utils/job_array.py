@@ -0,0 +1,68 @@
+"""Expand a bulk submission request into individual task arguments."""
+
+import itertools
+import os
+
+MAX_JOB_ARRAY_SIZE = int(os.environ.get("MAX_JOB_ARRAY_SIZE", 1000))
+
+
+def expand_job_array(data):
+    """Return one ``task_wrapper`` kwargs dict per task in a bulk request.
+
+    ``data`` either lists the commands to run under ``tasks``, or gives a
+    command template under ``task`` and a parameter grid under
+    ``parameters`` (a mapping of name to list of values); the template is
+    formatted with every combination of the grid. ``log_path`` is formatted
+    the same way and may also use ``{index}``; without any placeholder the
+    task index is appended so runs do not overwrite each other's logs.
+    """
+    log_path = data.get("log_path")
+    container_path = data.get("container_path")
+
+    if data.get("tasks") is not None:
+        commands = data["tasks"]
+        if not isinstance(commands, list) or not all(
+            isinstance(command, str) for command in commands
+        ):
+            raise ValueError("tasks must be a list of commands")
+        grid = [{} for _ in commands]
+    elif data.get("task") is not None and data.get("parameters") is not None:
+        parameters = data["parameters"]
+        if not isinstance(parameters, dict) or not all(
+            isinstance(values, list) for values in parameters.values()
+        ):
+            raise ValueError("parameters must map each name to a list of values")
+        names = list(parameters)
+        grid = [
+            dict(zip(names, values))
+            for values in itertools.product(*(parameters[name] for name in names))
+        ]
+        commands = [data["task"]] * len(grid)
+    else:
+        raise ValueError("Provide either tasks or a task template with parameters")
+
+    if not commands:
+        raise ValueError("No tasks to submit")
+    if len(commands) > MAX_JOB_ARRAY_SIZE:
+        raise ValueError(f"At most {MAX_JOB_ARRAY_SIZE} tasks can be submitted at once")
+
+    job_array = []
+    for index, (command, params) in enumerate(zip(commands, grid)):
+        try:
+            task_command = command.format_map(params) if params else command
+            task_log_path = None
+            if log_path:
+                if "{" in log_path:
+                    task_log_path = log_path.format_map({**params, "index": index})
+                else:
+                    task_log_path = f"{log_path}.{index}"
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"Could not format task {index}: {e}") from e
+        job_array.append(
+            {
+                "task_command": task_command,
+                "log_path": task_log_path,
+                "container_path": container_path,
+            }
+        )
+    return job_array
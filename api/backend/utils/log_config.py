@@ -0,0 +1,76 @@
+"""Configure backend logging once, off the request threads."""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+
+TEXT_FORMAT = "%(asctime)-15s.%(msecs)03dZ %(levelname)-7s : %(name)s - %(message)s"
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+# LogRecord attributes that are not user-supplied ``extra`` fields
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+_sample_rate = 1.0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra`` fields."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, DATE_FORMAT)
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging():
+    """Route every log record through a queue to a single writer thread.
+
+    Request threads only enqueue records, so a slow stderr or log collector
+    never stalls a request. ``LOG_LEVEL`` sets the root level, ``LOG_FORMAT``
+    picks ``text`` or ``json`` lines and ``LOG_SAMPLE_RATE`` is the share of
+    per-item messages kept by :func:`sampled`. Calling it again is a no-op.
+    """
+    global _listener, _sample_rate
+    if _listener is not None:
+        return
+
+    _sample_rate = float(os.environ.get("LOG_SAMPLE_RATE", 0.1))
+
+    output = logging.StreamHandler()
+    if os.environ.get("LOG_FORMAT", "text") == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT, DATE_FORMAT))
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(records)]
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+
+    _listener = logging.handlers.QueueListener(records, output)
+    _listener.start()
+    # flush whatever is still queued when the worker exits
+    atexit.register(_listener.stop)
+
+
+def sampled():
+    """Return True for roughly ``LOG_SAMPLE_RATE`` of calls.
+
+    Guard per-item messages with it, e.g. one line per task in a large
+    listing, so their volume does not grow with the size of the request.
+    """
+    return _sample_rate >= 1 or random.random() < _sample_rate
@@ -1,36 +1,180 @@
+import hashlib
 import json
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 
 import globus_sdk
-from flask import request
+from flask import request, session
 from globus_compute_sdk import Client as GlobusComputeClient
 from globus_compute_sdk.sdk.login_manager import AuthorizerLoginManager
 from globus_compute_sdk.sdk.login_manager.manager import ComputeScopeBuilder
 from globus_compute_sdk.serialize import CombinedCode
 from globus_sdk.scopes import AuthScopes
+from requests.adapters import HTTPAdapter
 
+from api.backend.utils.cache import ExpiringLRUCache
+from api.backend.utils.metrics import span
 
-def initialize_compute_login_manager() -> AuthorizerLoginManager:
-    tokens_cookie = request.cookies.get("tokens")
+# create log object with current module name
+log = logging.getLogger(__name__)
 
+
+class ComputeClientPool:
+    """Thread-safe LRU pool of Globus Compute clients.
+
+    Clients are keyed by identity and a fingerprint of the tokens they were
+    built from, so a refreshed token gets a fresh client while repeated
+    requests with the same tokens reuse one client and its HTTP session.
+    """
+
+    def __init__(self, max_size):
+        """Constructor."""
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._clients = OrderedDict()
+
+    def get(self, key, factory):
+        """Return the pooled client for ``key``, building it on a miss."""
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                self.hits += 1
+                return client
+            self.misses += 1
+
+        client = factory()
+
+        with self._lock:
+            # another thread may have built one meanwhile; keep the first
+            client = self._clients.setdefault(key, client)
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+        return client
+
+    def stats(self):
+        """Return pool counters."""
+        with self._lock:
+            return {
+                "size": len(self._clients),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+client_pool = ComputeClientPool(
+    max_size=int(os.environ.get("COMPUTE_CLIENT_POOL_SIZE", 256))
+)
+# HTTP connections each pooled client keeps alive for concurrent requests
+CLIENT_HTTP_POOL_SIZE = int(os.environ.get("COMPUTE_CLIENT_HTTP_POOL_SIZE", 20))
+
+# parsed tokens cookies, keyed by a hash of the cookie value
+token_cache = ExpiringLRUCache(
+    max_entries=int(os.environ.get("TOKEN_CACHE_SIZE", 1024))
+)
+# how long to keep a parsed cookie whose tokens carry no expiry
+TOKEN_CACHE_DEFAULT_TTL = 300
+
+
+def cookie_key(tokens_cookie):
+    """Hash of a cookie value, used to key caches without keeping tokens."""
+    return hashlib.sha256(tokens_cookie.encode()).hexdigest()
+
+
+class ComputeTokens:
+    """Access tokens resolved from one ``tokens`` cookie.
+
+    The login manager holding their authorizers is built on first use and
+    then shared by every request presenting the same cookie.
+    """
+
+    def __init__(self, funcx_service_token, openid_token):
+        """Constructor."""
+        self.funcx_service_token = funcx_service_token
+        self.openid_token = openid_token
+        self.fingerprint = hashlib.sha256(
+            f"{funcx_service_token}:{openid_token}".encode()
+        ).hexdigest()
+        self._login_manager = None
+
+    @property
+    def login_manager(self):
+        if self._login_manager is None:
+            self._login_manager = build_compute_login_manager(
+                self.funcx_service_token, self.openid_token
+            )
+        return self._login_manager
+
+
+def parse_compute_tokens(tokens_cookie):
+    """Return the cookie's ComputeTokens and the epoch time they expire."""
     try:
         # Sanitize the cookie data
         sanitized_tokens_cookie = tokens_cookie.replace("'", '"').replace("\\054", ",")
         tokens_value = json.loads(sanitized_tokens_cookie)
         # tokens_value = json.loads(tokens['value'].replace("\\054", ","))
     except json.JSONDecodeError as e:
-        logging.error(f"Error decoding JSON from tokens cookie: {e}")
+        log.error("Error decoding JSON from tokens cookie: %s", e)
         raise
 
     openid_token = None
     funcx_service_token = None
+    expiries = []
 
     for key, value in tokens_value.items():
         if value.get("resource_server") == "funcx_service":
             funcx_service_token = value.get("access_token")
+            expiries.append(value.get("expires_at_seconds"))
         if "openid" in value.get("scope", ""):
             openid_token = value.get("access_token")
+            expiries.append(value.get("expires_at_seconds"))
+
+    expiries = [expires_at for expires_at in expiries if expires_at]
+    if expiries:
+        expires_at = min(expiries)
+    else:
+        expires_at = time.time() + TOKEN_CACHE_DEFAULT_TTL
+    return ComputeTokens(funcx_service_token, openid_token), expires_at
+
+
+def resolve_compute_tokens(tokens_cookie=None):
+    """Return the ComputeTokens for the request's ``tokens`` cookie.
+
+    Parsed cookies are cached by a hash of their value until the earliest
+    expiry of the tokens they hold.
+    """
+    if tokens_cookie is None:
+        tokens_cookie = request.cookies.get("tokens")
+    if tokens_cookie is None:
+        raise ValueError("No tokens cookie in the request")
 
+    key = cookie_key(tokens_cookie)
+    tokens = token_cache.get(key)
+    if tokens is None:
+        tokens, expires_at = parse_compute_tokens(tokens_cookie)
+        token_cache.set(key, tokens, expires_at)
+    return tokens
+
+
+def load_compute_tokens():
+    """Return the funcx service and openid access tokens from the cookie."""
+    tokens = resolve_compute_tokens()
+    return tokens.funcx_service_token, tokens.openid_token
+
+
+def build_compute_login_manager(
+    funcx_service_token, openid_token
+) -> AuthorizerLoginManager:
     ComputeScopes = ComputeScopeBuilder()
     compute_auth = globus_sdk.AccessTokenAuthorizer(funcx_service_token)
     openid_auth = globus_sdk.AccessTokenAuthorizer(openid_token)
@@ -46,6 +190,63 @@ def initialize_compute_login_manager() -> AuthorizerLoginManager:
     return compute_login_manager
 
 
+def initialize_compute_login_manager(
+    funcx_service_token=None, openid_token=None
+) -> AuthorizerLoginManager:
+    if funcx_service_token is None and openid_token is None:
+        return resolve_compute_tokens().login_manager
+    return build_compute_login_manager(funcx_service_token, openid_token)
+
+
+def build_globus_compute_client(login_manager) -> GlobusComputeClient:
+    client = GlobusComputeClient(
+        login_manager=login_manager, code_serialization_strategy=CombinedCode()
+    )
+    # let threads sharing this client keep their connections alive
+    adapter = HTTPAdapter(pool_maxsize=CLIENT_HTTP_POOL_SIZE)
+    client.web_client.transport.session.mount("https://", adapter)
+    return client
+
+
 def initialize_globus_compute_client() -> GlobusComputeClient:
-    login_manager = initialize_compute_login_manager()
-    return GlobusComputeClient(login_manager=login_manager, code_serialization_strategy=CombinedCode())
+    with span("compute_tokens"):
+        tokens = resolve_compute_tokens()
+
+    def build():
+        with span("compute_client_build"):
+            return build_globus_compute_client(tokens.login_manager)
+
+    return client_pool.get(
+        (session.get("primary_identity"), tokens.fingerprint), build
+    )
+
+
+def initialize_service_compute_client() -> GlobusComputeClient:
+    """Return the client the serverless service handlers submit with.
+
+    It authenticates as the deployment itself, from
+    ``GLOBUS_COMPUTE_CLIENT_ID`` and ``GLOBUS_COMPUTE_CLIENT_SECRET``.
+    """
+
+    def build():
+        with span("compute_client_build"):
+            return build_globus_compute_client(None)
+
+    return client_pool.get((None, "service"), build)
+
+
+def service_principal():
+    """Principal the service handlers submit as, for keying its resources.
+
+    Tasks and functions belong to the Globus Compute client that created
+    them, so anything the service client creates is tracked under this
+    principal instead of the identity it was submitted for.
+    """
+    return f"client:{os.environ.get('GLOBUS_COMPUTE_CLIENT_ID')}"
+
+
+def compute_client_for(principal=None) -> GlobusComputeClient:
+    """Return the client of a submitting principal; None is the user's own."""
+    if principal is None:
+        return initialize_globus_compute_client()
+    return initialize_service_compute_client()
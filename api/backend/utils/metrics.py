@@ -0,0 +1,180 @@
+"""Time hot paths and expose the timings to Prometheus and the browser."""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+# seconds; fine-grained at the low end where SQLite and token parsing live
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+
+HISTOGRAMS = {
+    "diamond_span_seconds": "Time spent in an instrumented operation.",
+    "diamond_request_seconds": "Time to handle an HTTP request, by route.",
+}
+COUNTERS = {
+    "diamond_span_errors_total": "Instrumented operations that raised.",
+    "diamond_requests_total": "HTTP requests handled, by route and status.",
+}
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observed values."""
+
+    def __init__(self, buckets):
+        """Constructor."""
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Thread-safe registry of labelled histograms and counters."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Constructor."""
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # name -> labels tuple -> Histogram
+        self._histograms = {name: {} for name in HISTOGRAMS}
+        # name -> labels tuple -> count
+        self._counters = {name: {} for name in COUNTERS}
+
+    def observe(self, name, value, **labels):
+        """Record one value in a histogram."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histogram = self._histograms[name].get(key)
+            if histogram is None:
+                histogram = self._histograms[name][key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def increment(self, name, amount=1, **labels):
+        """Add to a counter."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counter = self._counters[name]
+            counter[key] = counter.get(key, 0) + amount
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in self._histograms.items():
+                lines.append(f"# HELP {name} {HISTOGRAMS[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(series.items()):
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        labels = format_labels(key + (("le", f"{bound:g}"),))
+                        lines.append(f"{name}_bucket{labels} {count}")
+                    labels = format_labels(key + (("le", "+Inf"),))
+                    lines.append(f"{name}_bucket{labels} {histogram.count}")
+                    lines.append(f"{name}_sum{format_labels(key)} {histogram.sum}")
+                    lines.append(
+                        f"{name}_count{format_labels(key)} {histogram.count}"
+                    )
+            for name, series in self._counters.items():
+                lines.append(f"# HELP {name} {COUNTERS[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, count in sorted(series.items()):
+                    lines.append(f"{name}{format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels):
+    """Render label pairs as ``{name="value",...}``."""
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{name}="{escape_label_value(value)}"' for name, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+def escape_label_value(value):
+    """Escape a label value as Prometheus expects."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def span(name):
+    """Time a block as one ``name`` span.
+
+    The duration always feeds the ``diamond_span_seconds`` histogram. Inside
+    a request it is also added to that request's ``Server-Timing`` header.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.increment("diamond_span_errors_total", span=name)
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        metrics.observe("diamond_span_seconds", duration, span=name)
+        if has_request_context():
+            spans = g.setdefault("spans", {})
+            total, count = spans.get(name, (0.0, 0))
+            spans[name] = (total + duration, count + 1)
+
+
+def server_timing(spans, total):
+    """Format per-span totals, in seconds, as a ``Server-Timing`` value."""
+    entries = [
+        f'{name};desc="{count}x";dur={duration * 1000:.2f}'
+        for name, (duration, count) in spans.items()
+    ]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def init_request_metrics(app):
+    """Time every request and attach its spans as ``Server-Timing``.
+
+    ``SERVER_TIMING_ENABLED=false`` keeps the metrics but drops the header,
+    for deployments that should not reveal backend timings to browsers.
+    """
+    header_enabled = (
+        os.environ.get("SERVER_TIMING_ENABLED", "true").lower() == "true"
+    )
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get("request_started")
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        endpoint = request.endpoint or "unmatched"
+        metrics.observe("diamond_request_seconds", total, endpoint=endpoint)
+        metrics.increment(
+            "diamond_requests_total",
+            endpoint=endpoint,
+            method=request.method,
+            status=response.status_code,
+        )
+        if header_enabled:
+            response.headers["Server-Timing"] = server_timing(
+                g.get("spans", {}), total
+            )
+            # expose the timings to the browser's Resource Timing API too
+            response.headers["Timing-Allow-Origin"] = os.environ.get("HOST") or "*"
+        return response
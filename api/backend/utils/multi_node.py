@@ -0,0 +1,55 @@
+"""Validate multi-node (MPI) task submissions."""
+
+import os
+
+MAX_NODES = int(os.environ.get("MULTI_NODE_MAX_NODES", 64))
+MAX_RANKS_PER_NODE = int(os.environ.get("MULTI_NODE_MAX_RANKS_PER_NODE", 256))
+# launchers the task wrapper can generate itself
+LAUNCHERS = ("ibrun", "srun", "mpiexec")
+
+
+def positive_int(data, key, default, maximum):
+    """Read an integer in ``[1, maximum]`` from the request."""
+    value = data.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{key} must be an integer")
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{key} must be an integer") from None
+    if not 1 <= value <= maximum:
+        raise ValueError(f"{key} must be between 1 and {maximum}")
+    return value
+
+
+def parse_multi_node_request(data):
+    """Return the ``mpi_task_wrapper`` arguments of a multi-node request.
+
+    ``task`` is the command each rank runs and ``endpoint`` the Globus
+    Compute endpoint. ``num_nodes`` and ``ranks_per_node`` default to 1.
+    The command runs inside the image at ``container_path``, or of the
+    registered container ``container_id``, when either is given.
+
+    By default the endpoint's MPI engine provisions the nodes and supplies
+    the launcher. Naming a ``launcher`` instead runs it inside the
+    endpoint's existing allocation, for endpoints without that engine.
+    """
+    launcher = data.get("launcher")
+    if launcher is not None and launcher not in LAUNCHERS:
+        raise ValueError(f"launcher must be one of {', '.join(LAUNCHERS)}")
+    if not data.get("endpoint"):
+        raise ValueError("endpoint is required")
+    if not data.get("task"):
+        raise ValueError("task is required")
+    return {
+        "endpoint_id": data["endpoint"],
+        "task_command": data["task"],
+        "log_path": data.get("log_path"),
+        "container_path": data.get("container_path"),
+        "container_id": data.get("container_id"),
+        "num_nodes": positive_int(data, "num_nodes", 1, MAX_NODES),
+        "ranks_per_node": positive_int(
+            data, "ranks_per_node", 1, MAX_RANKS_PER_NODE
+        ),
+        "launcher": launcher,
+    }
@@ -0,0 +1,62 @@
+"""Parse listing query parameters and encode keyset pagination cursors."""
+
+import base64
+import json
+import os
+
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", 500))
+LISTING_ARGS = ("limit", "cursor", "status", "created_after", "created_before")
+
+
+def encode_cursor(create_time, item_id):
+    """Return an opaque cursor pointing just past the given row."""
+    raw = json.dumps([create_time, item_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    """Return the ``(create_time, id)`` a cursor points past."""
+    try:
+        create_time, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor") from None
+    return create_time, item_id
+
+
+def is_paginated(args):
+    """Return True if the request asks for a page rather than everything."""
+    return "limit" in args or "cursor" in args
+
+
+def parse_listing_args(args):
+    """Turn request query parameters into ``Database`` listing arguments.
+
+    Raises ``ValueError`` with a message suitable for a 400 response.
+    """
+    listing = {
+        "status": args.get("status"),
+        "created_after": args.get("created_after"),
+        "created_before": args.get("created_before"),
+        "cursor": None,
+        "limit": None,
+    }
+    if args.get("cursor"):
+        listing["cursor"] = decode_cursor(args["cursor"])
+    if is_paginated(args):
+        try:
+            limit = int(args.get("limit", MAX_PAGE_SIZE))
+        except ValueError:
+            raise ValueError("limit must be an integer") from None
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        listing["limit"] = limit
+    return listing
+
+
+def paginate(rows, limit, time_key, id_key):
+    """Split ``limit + 1`` fetched rows into a page and the next cursor."""
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last[time_key], last[id_key])
@@ -0,0 +1,338 @@
+"""Refresh in-flight task and container status in the background."""
+
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
+
+from flask import has_app_context
+
+from api.backend.utils.task_status import (
+    forget_statuses,
+    get_task_statuses,
+    is_terminal,
+    status_to_record,
+)
+
+# create log object with current module name
+log = logging.getLogger(__name__)
+
+TASK = "task"
+CONTAINER = "container"
+
+
+class WatchedTask:
+    """Polling state for one in-flight task or container build."""
+
+    def __init__(self, kind, identity_id, principal, interval):
+        self.kind = kind
+        self.identity_id = identity_id
+        # whose client submitted it, and so can poll it
+        self.principal = principal
+        self.interval = interval
+        self.next_poll = time.monotonic() + interval
+
+
+class Subscription:
+    """Queue of status changes for one streaming client."""
+
+    def __init__(self, identity_id, maxsize=1000):
+        self.identity_id = identity_id
+        self.events = queue.Queue(maxsize=maxsize)
+        # set when the client fell too far behind and must resync
+        self.overflowed = False
+
+    def publish(self, event):
+        """Queue an event, flagging the subscription if it is full."""
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+
+class StatusPoller:
+    """Background status poller backed by a shared in-process cache.
+
+    Requests hand the poller the IDs they care about together with a
+    Globus Compute client of the principal that submitted them. A daemon thread
+    then refreshes every watched ID, starting at ``min_interval`` and
+    backing off towards ``max_interval`` while the status stays the same.
+    Routes read the latest status from the cache instead of calling out.
+    Terminal states are persisted and the ID is dropped from the cache, so
+    the database stays the source of truth for finished work.
+    """
+
+    def __init__(self, app, database, result_store):
+        """Constructor."""
+        self.app = app
+        self.database = database
+        self.result_store = result_store
+        self.enabled = (
+            os.environ.get("STATUS_POLLER_ENABLED", "true").lower() == "true"
+        )
+        self.min_interval = float(os.environ.get("STATUS_POLL_MIN_INTERVAL", 2))
+        self.max_interval = float(os.environ.get("STATUS_POLL_MAX_INTERVAL", 60))
+        self.idle_timeout = float(os.environ.get("STATUS_POLLER_IDLE_TIMEOUT", 900))
+        self.backoff = 1.5
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        # principal -> (client, last time a request handed it over)
+        self._clients = {}
+        # task_id -> WatchedTask
+        self._watched = {}
+        # task_id -> latest status entry
+        self._statuses = {}
+        # identity_id -> set of Subscription
+        self._subscribers = {}
+
+    def start(self):
+        """Start the polling thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="status-poller", daemon=True
+        )
+        self._thread.start()
+        log.info("Status poller started")
+
+    def stop(self):
+        """Stop the polling thread."""
+        self._stopped.set()
+        self._wakeup.set()
+
+    def get(self, task_id):
+        """Return the cached status for a task, or None if not cached."""
+        return self._statuses.get(task_id)
+
+    def watch(self, kind, identity_id, client, task_ids, principal=None):
+        """Track an identity's in-flight IDs, polled with the latest client.
+
+        ``principal`` names who owns ``client`` and submitted the IDs; it
+        defaults to the identity itself. Clients are kept per principal, so
+        a task is only ever polled by the client that can see it.
+        """
+        if not self.enabled:
+            return
+        principal = principal or identity_id
+        with self._lock:
+            self._clients[principal] = (client, time.monotonic())
+            added = False
+            for task_id in task_ids:
+                if task_id not in self._watched:
+                    self._watched[task_id] = WatchedTask(
+                        kind, identity_id, principal, self.min_interval
+                    )
+                    added = True
+        if added:
+            self._wakeup.set()
+
+    def forget(self, task_id):
+        """Stop tracking an ID, e.g. after it was deleted."""
+        with self._lock:
+            self._watched.pop(task_id, None)
+            self._statuses.pop(task_id, None)
+
+    def subscribe(self, identity_id):
+        """Register a streaming client for an identity's status changes."""
+        subscription = Subscription(identity_id)
+        with self._lock:
+            self._subscribers.setdefault(identity_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a streaming client."""
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.identity_id, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.identity_id, None)
+
+    def lookup(self, kind, identity_id, client, task_ids, principal=None):
+        """Return status for in-flight IDs, mostly from the cache.
+
+        IDs the poller has not seen yet are fetched once synchronously so
+        the first response is complete; afterwards they are refreshed in
+        the background. With the poller disabled every ID is fetched here.
+        ``client`` must belong to the ``principal`` that submitted them.
+        """
+        self.watch(kind, identity_id, client, task_ids, principal)
+        statuses = {}
+        missing = []
+        for task_id in task_ids:
+            status = self._statuses.get(task_id)
+            if status is None:
+                missing.append(task_id)
+            else:
+                statuses[task_id] = status
+
+        if missing:
+            self.database.release_db()
+            fetched = get_task_statuses(client, missing)
+            self._store(kind, client, fetched)
+            statuses.update(fetched)
+
+        return statuses
+
+    def _store(self, kind, client, statuses):
+        """Update the cache, persist status changes and notify subscribers.
+
+        Terminal states are persisted in full and dropped from the cache,
+        and from the status cache of the ``client`` that fetched them.
+        Other changes only update the persisted status, which keeps the
+        task change counter moving for incremental clients.
+        """
+        with self._lock:
+            previous = {task_id: self._statuses.get(task_id) for task_id in statuses}
+        changed = {
+            task_id: status
+            for task_id, status in statuses.items()
+            if "error" not in status
+            and (
+                previous[task_id] is None
+                or previous[task_id].get("status") != status.get("status")
+            )
+        }
+        # build_task_id -> [(identity_id, container_task_id)] sharing the build
+        containers = {}
+        if changed:
+            # inside a request, write on its connection rather than taking
+            # a second one from the pool
+            context = nullcontext() if has_app_context() else self.app.app_context()
+            with context:
+                if kind == TASK:
+                    records = []
+                    for task_id, status in changed.items():
+                        record = status_to_record(task_id, status)
+                        if is_terminal(status.get("status")):
+                            self.result_store.offload(record, status)
+                        records.append(record)
+                    self.database.update_task_statuses(records)
+                else:
+                    self.database.update_container_statuses(
+                        (task_id, status["status"])
+                        for task_id, status in changed.items()
+                    )
+                    for container in self.database.load_build_containers(changed):
+                        containers.setdefault(container["build_task_id"], []).append(
+                            (container["identity_id"], container["container_task_id"])
+                        )
+
+        with self._lock:
+            changes = []
+            for task_id, status in statuses.items():
+                watched = self._watched.get(task_id)
+                if is_terminal(status.get("status")):
+                    self._watched.pop(task_id, None)
+                    self._statuses.pop(task_id, None)
+                elif watched is not None and (
+                    "error" not in status or task_id not in self._statuses
+                ):
+                    # keep the last good status when a refresh fails
+                    self._statuses[task_id] = status
+                else:
+                    continue
+                if watched is None or task_id not in changed:
+                    continue
+                if kind == TASK:
+                    event = {"kind": kind, "id": task_id, "status": status}
+                    changes.append((watched.identity_id, event))
+                else:
+                    # clients know containers by their own ID, not the build's
+                    for identity_id, container_task_id in containers.get(task_id, ()):
+                        event = {
+                            "kind": kind,
+                            "id": container_task_id,
+                            "status": status,
+                        }
+                        changes.append((identity_id, event))
+
+            for identity_id, event in changes:
+                for subscription in self._subscribers.get(identity_id, ()):
+                    subscription.publish(event)
+
+        forget_statuses(
+            client,
+            [
+                task_id
+                for task_id, status in statuses.items()
+                if is_terminal(status.get("status"))
+            ],
+        )
+
+    def _run(self):
+        """Poll due IDs until stopped."""
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            try:
+                delay = self._poll_due()
+            except Exception as e:
+                log.exception("Status poller iteration failed: %s", e)
+                delay = self.min_interval
+            self._wakeup.wait(delay)
+
+    def _poll_due(self):
+        """Refresh every due ID and return the delay until the next one."""
+        now = time.monotonic()
+        due = {}
+        with self._lock:
+            self._evict_idle(now)
+            for task_id, watched in self._watched.items():
+                if watched.next_poll <= now:
+                    key = (watched.principal, watched.kind)
+                    due.setdefault(key, []).append(task_id)
+
+        for (principal, kind), task_ids in due.items():
+            client = self._clients.get(principal, (None,))[0]
+            if client is None:
+                continue
+            previous = {task_id: self._statuses.get(task_id) for task_id in task_ids}
+            fetched = get_task_statuses(client, task_ids)
+            self._store(kind, client, fetched)
+            self._reschedule(previous, fetched)
+
+        with self._lock:
+            if not self._watched:
+                return self.max_interval
+            next_poll = min(watched.next_poll for watched in self._watched.values())
+        return min(max(next_poll - time.monotonic(), 0.1), self.max_interval)
+
+    def _reschedule(self, previous, fetched):
+        """Back off IDs whose status did not change, reset the others."""
+        now = time.monotonic()
+        with self._lock:
+            for task_id, status in fetched.items():
+                watched = self._watched.get(task_id)
+                if watched is None:
+                    continue
+                old = previous.get(task_id)
+                if old is not None and old.get("status") == status.get("status"):
+                    watched.interval = min(
+                        watched.interval * self.backoff, self.max_interval
+                    )
+                else:
+                    watched.interval = self.min_interval
+                watched.next_poll = now + watched.interval
+
+    def _evict_idle(self, now):
+        """Drop principals that have neither requested nor streamed for a while."""
+        # principals polling tasks that someone is streaming stay
+        streamed = {
+            watched.principal
+            for watched in self._watched.values()
+            if watched.identity_id in self._subscribers
+        }
+        for principal, (_, last_seen) in list(self._clients.items()):
+            if principal in self._subscribers or principal in streamed:
+                continue
+            if now - last_seen > self.idle_timeout:
+                log.info("Status poller dropping idle principal %s", principal)
+                del self._clients[principal]
+                for task_id, watched in list(self._watched.items()):
+                    if watched.principal == principal:
+                        del self._watched[task_id]
+                        self._statuses.pop(task_id, None)
@@ -0,0 +1,129 @@
+"""Store the results and exceptions of finished tasks."""
+
+import json
+import logging
+import os
+import zlib
+
+from api.backend.utils.cache import ByteLRUCache
+
+# create log object with current module name
+log = logging.getLogger(__name__)
+
+
+def task_output(task_id, status):
+    """Serialize a finished task's status entry as served by ``/api/task_result``."""
+    return json.dumps(
+        {
+            "task_id": task_id,
+            "status": status["status"],
+            "result": status.get("result"),
+            "exception": status.get("exception", status.get("reason")),
+            "completion_t": status.get("completion_t"),
+        },
+        default=str,
+    ).encode()
+
+
+class ResultStore:
+    """Compressed task output in SQLite or sidecar files, fronted by an LRU.
+
+    Outputs are zlib-compressed. Those that compress to at most
+    ``RESULT_INLINE_MAX_BYTES`` are stored in the ``task_output`` table,
+    larger ones in a file under ``RESULT_BLOB_DIR`` referenced from it.
+    Recently read outputs stay uncompressed in memory, bounded by
+    ``RESULT_CACHE_MAX_BYTES``.
+
+    Only results whose JSON exceeds ``TASK_RESULT_MAX_BYTES`` are stored
+    here; smaller ones stay in the ``task`` row and are served from it.
+    """
+
+    def __init__(self, database):
+        """Constructor."""
+        self.database = database
+        self.inline_max_bytes = int(
+            os.environ.get("RESULT_INLINE_MAX_BYTES", 256 * 1024)
+        )
+        self.blob_dir = os.environ.get("RESULT_BLOB_DIR") or os.path.join(
+            os.path.dirname(os.path.abspath(os.environ["DATABASE"])), "results"
+        )
+        self.task_result_max_bytes = int(
+            os.environ.get("TASK_RESULT_MAX_BYTES", 4096)
+        )
+        self.cache = ByteLRUCache(
+            int(os.environ.get("RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+        )
+
+    def get(self, task_id):
+        """Return a task's stored output, or None if it was never stored."""
+        output = self.cache.get(task_id)
+        if output is not None:
+            return output
+
+        row = self.database.load_task_output(task_id)
+        if row is None:
+            return None
+        if row["blob_path"]:
+            try:
+                with open(row["blob_path"], "rb") as blob:
+                    payload = blob.read()
+            except FileNotFoundError:
+                log.warning("Output file of task %s is missing", task_id)
+                return None
+        else:
+            payload = row["payload"]
+
+        output = zlib.decompress(payload)
+        self.cache.set(task_id, output)
+        return output
+
+    def put(self, task_id, output):
+        """Compress and persist a task's output."""
+        payload = zlib.compress(output)
+        blob_path = None
+        if len(payload) > self.inline_max_bytes:
+            os.makedirs(self.blob_dir, exist_ok=True)
+            blob_path = os.path.join(self.blob_dir, f"{task_id}.z")
+            partial_path = f"{blob_path}.partial"
+            with open(partial_path, "wb") as blob:
+                blob.write(payload)
+            os.replace(partial_path, blob_path)
+            payload = None
+
+        self.database.save_task_output(
+            task_id=task_id,
+            encoding="zlib",
+            size=len(output),
+            payload=payload,
+            blob_path=blob_path,
+        )
+        self.cache.set(task_id, output)
+
+    def offload(self, record, status):
+        """Move a large finished result out of its ``task`` row.
+
+        ``record`` holds the ``task`` column values built from ``status``.
+        A result too large for the row is stored here instead and dropped
+        from both, so listings and status events stay small; clients read
+        it back through ``/api/task_result``.
+        """
+        result = record["task_result"]
+        if result is None or len(result) <= self.task_result_max_bytes:
+            return
+        self.put(record["task_id"], task_output(record["task_id"], status))
+        record["task_result"] = None
+        del status["result"]
+
+    def forget(self, task_id):
+        """Drop a task's output from memory and disk.
+
+        Only the file recorded for the task is removed, so call it before
+        the task's ``task_output`` row is deleted.
+        """
+        self.cache.invalidate(task_id)
+        row = self.database.load_task_output(task_id)
+        if row is not None and row["blob_path"]:
+            try:
+                os.remove(row["blob_path"])
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,59 @@
+"""Serve submission engine calls as serverless HTTP handlers."""
+
+import json
+from http.server import BaseHTTPRequestHandler
+
+from api.backend import app
+from api.backend.utils.decorators import bearer_identity
+from api.backend.utils.login_flow import (
+    initialize_service_compute_client,
+    service_principal,
+)
+
+
+def service_handler(submit, message):
+    """Return a handler class that POSTs its JSON body to ``submit``.
+
+    ``submit(client, identity_id, data, principal)`` is a submission
+    engine method; the work belongs to the caller's identity but is
+    registered and polled under the service client's principal. Callers
+    authenticate with an ``Authorization: Bearer`` token issued for the
+    portal, which is introspected for the identity to submit as;
+    requests without a valid one get a 401. The response is ``message``
+    with the submission result, or a 400 with the validation error.
+    """
+
+    class handler(BaseHTTPRequestHandler):
+
+        def do_POST(self):
+            identity_id = bearer_identity(self.headers.get("Authorization"))
+            if identity_id is None:
+                self.send_json(401, {"message": "A valid bearer token is required"})
+                return
+
+            content_length = int(self.headers["Content-Length"])
+            post_data = self.rfile.read(content_length)
+            try:
+                data = json.loads(post_data.decode("utf-8"))
+                if not isinstance(data, dict):
+                    raise ValueError("Expected a JSON object")
+                with app.app_context():
+                    result = submit(
+                        initialize_service_compute_client(),
+                        identity_id,
+                        data,
+                        principal=service_principal(),
+                    )
+            except ValueError as e:
+                # json.JSONDecodeError is a ValueError too
+                self.send_json(400, {"message": str(e)})
+                return
+            self.send_json(200, {"message": message, "result": result})
+
+        def send_json(self, status, response):
+            self.send_response(status)
+            self.send_header("Content-type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps(response).encode("utf-8"))
+
+    return handler
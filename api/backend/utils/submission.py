@@ -0,0 +1,294 @@
+"""Submit tasks and container builds to Globus Compute and record them."""
+
+import logging
+import uuid
+from datetime import datetime
+
+from api.backend.utils.job_array import expand_job_array
+from api.backend.utils.metrics import span
+from api.backend.utils.multi_node import parse_multi_node_request
+from api.backend.utils.task_status import is_terminal
+from api.backend.utils.wrappers import (
+    container_builder_wrapper,
+    mpi_task_wrapper,
+    task_wrapper,
+)
+
+# create log object with current module name
+log = logging.getLogger(__name__)
+
+
+def parse_task_request(data):
+    """Return the ``task_wrapper`` arguments of a single task request."""
+    if not data.get("endpoint"):
+        raise ValueError("endpoint is required")
+    if not data.get("task"):
+        raise ValueError("task is required")
+    return {
+        "endpoint_id": data["endpoint"],
+        "task_command": data["task"],
+        "log_path": data.get("log_path"),
+        "container_path": data.get("container_path"),
+        "container_id": data.get("container_id"),
+    }
+
+
+def parse_container_request(data):
+    """Return the fields of a container build request."""
+    if not data.get("endpoint"):
+        raise ValueError("endpoint is required")
+    if not data.get("base_image") or not data.get("location") or not data.get("name"):
+        raise ValueError("base_image, location and name are required")
+    return {
+        "endpoint_id": data["endpoint"],
+        "base_image": data["base_image"],
+        "location": data["location"],
+        "name": data["name"],
+        "description": data.get("description"),
+        "rebuild": bool(data.get("rebuild")),
+    }
+
+
+def now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class SubmissionEngine:
+    """Single path from a submission request to a recorded, watched task.
+
+    Both the Flask routes and the serverless service handlers submit
+    through it. Each call validates the request, reuses the registered
+    function, hands the work to Globus Compute and returns the new IDs
+    without waiting for the work to run. Requests are plain dicts and a
+    bad one raises ValueError.
+
+    ``identity_id`` owns the submitted work. ``principal`` is set when the
+    ``client`` belongs to someone else, such as the service client; the
+    function registrations and status polling then belong to it.
+    """
+
+    def __init__(self, database, function_registry, container_images, status_poller):
+        """Constructor."""
+        self.database = database
+        self.function_registry = function_registry
+        self.container_images = container_images
+        self.status_poller = status_poller
+
+    def submit_task(self, client, identity_id, data, principal=None):
+        """Submit one task and return its ID."""
+        job = parse_task_request(data)
+        container_path = self.container_path(identity_id, job)
+        function_id = self.function_registry.get_function_id(
+            client, task_wrapper, principal or identity_id
+        )
+        self.database.release_db()
+        with span("run"):
+            task_id = client.run(
+                task_command=job["task_command"],
+                log_path=job["log_path"],
+                container_path=container_path,
+                endpoint_id=job["endpoint_id"],
+                function_id=function_id,
+            )
+        self.record_tasks(
+            client,
+            identity_id,
+            job["endpoint_id"],
+            [(task_id, job["log_path"])],
+            principal=principal,
+        )
+        log.info("task id is %s", task_id)
+        return task_id
+
+    def submit_tasks(self, client, identity_id, data, principal=None):
+        """Submit a job array as one batch; returns its group and task IDs."""
+        job_array = expand_job_array(data)
+        endpoint_id = data.get("endpoint")
+        if not endpoint_id:
+            raise ValueError("endpoint is required")
+        function_id = self.function_registry.get_function_id(
+            client, task_wrapper, principal or identity_id
+        )
+
+        batch = client.create_batch()
+        for task_kwargs in job_array:
+            batch.add(function_id=function_id, kwargs=task_kwargs)
+        self.database.release_db()
+        with span("batch_run"):
+            submitted = client.batch_run(endpoint_id=endpoint_id, batch=batch)
+
+        task_group_id = submitted["task_group_id"]
+        # the batch holds a single function, so this is every task in order
+        task_ids = [task_id for ids in submitted["tasks"].values() for task_id in ids]
+        self.record_tasks(
+            client,
+            identity_id,
+            endpoint_id,
+            [
+                (task_id, task_kwargs["log_path"])
+                for task_id, task_kwargs in zip(task_ids, job_array)
+            ],
+            task_group_id=task_group_id,
+            principal=principal,
+        )
+        log.info("submitted %d tasks in group %s", len(task_ids), task_group_id)
+        return {"task_group_id": task_group_id, "task_ids": task_ids}
+
+    def submit_multi_node_task(self, client, identity_id, data, principal=None):
+        """Submit one task spanning several nodes and return its ID.
+
+        Unless the request names a ``launcher``, the endpoint is asked for
+        ``num_nodes`` x ``ranks_per_node`` through the batch resource
+        specification.
+        """
+        job = parse_multi_node_request(data)
+        container_path = self.container_path(identity_id, job)
+        function_id = self.function_registry.get_function_id(
+            client, mpi_task_wrapper, principal or identity_id
+        )
+        resource_specification = None
+        if job["launcher"] is None:
+            resource_specification = {
+                "num_nodes": job["num_nodes"],
+                "ranks_per_node": job["ranks_per_node"],
+            }
+        batch = client.create_batch(resource_specification=resource_specification)
+        batch.add(
+            function_id=function_id,
+            kwargs={
+                "task_command": job["task_command"],
+                "log_path": job["log_path"],
+                "container_path": container_path,
+                "num_nodes": job["num_nodes"],
+                "ranks_per_node": job["ranks_per_node"],
+                "launcher": job["launcher"],
+            },
+        )
+        self.database.release_db()
+        with span("batch_run"):
+            submitted = client.batch_run(endpoint_id=job["endpoint_id"], batch=batch)
+        task_id = next(task_id for ids in submitted["tasks"].values() for task_id in ids)
+
+        self.record_tasks(
+            client,
+            identity_id,
+            job["endpoint_id"],
+            [(task_id, job["log_path"])],
+            principal=principal,
+        )
+        log.info(
+            "task id is %s on %d nodes x %d ranks",
+            task_id,
+            job["num_nodes"],
+            job["ranks_per_node"],
+        )
+        return task_id
+
+    def register_container(self, client, identity_id, data, principal=None):
+        """Build a container image, reusing one already built from the same source.
+
+        Returns the container's ID, its build task, where the image lives
+        and whether it came from the image index.
+        """
+        job = parse_container_request(data)
+        image_path = f"{job['location']}/{job['name']}"
+
+        def build():
+            function_id = self.function_registry.get_function_id(
+                client, container_builder_wrapper, principal or identity_id
+            )
+            log.info(
+                "Building container %s from %s at %s on endpoint %s with function %s",
+                job["name"],
+                job["base_image"],
+                job["location"],
+                job["endpoint_id"],
+                function_id,
+            )
+            self.database.release_db()
+            with span("run"):
+                return client.run(
+                    base_image=job["base_image"],
+                    location=job["location"],
+                    name=job["name"],
+                    endpoint_id=job["endpoint_id"],
+                    function_id=function_id,
+                )
+
+        image = self.container_images.get_or_build(
+            principal or identity_id,
+            job["endpoint_id"],
+            job["base_image"],
+            job["location"],
+            image_path,
+            build,
+            rebuild=job["rebuild"],
+        )
+        build_task_id = image["build_task_id"]
+        # a reused image gets its own record pointing at the earlier build
+        container_task_id = str(uuid.uuid4()) if image["cache_hit"] else build_task_id
+
+        self.database.save_container(
+            container_task_id=container_task_id,
+            identity_id=identity_id,
+            base_image=job["base_image"],
+            name=job["name"],
+            location=job["location"],
+            description=job["description"],
+            container_create_time=now(),
+            endpoint_id=job["endpoint_id"],
+            build_task_id=build_task_id,
+            image_path=image["image_path"],
+            cache_hit=image["cache_hit"],
+            container_status=image["image_status"],
+            principal=principal,
+        )
+        if not is_terminal(image["image_status"]):
+            self.status_poller.watch(
+                "container", identity_id, client, [build_task_id], principal
+            )
+        return {
+            "container_task_id": container_task_id,
+            "build_task_id": build_task_id,
+            "image_path": image["image_path"],
+            "cache_hit": image["cache_hit"],
+        }
+
+    def container_path(self, identity_id, job):
+        """Return the image to run in, resolving a registered ``container_id``."""
+        if job["container_id"] and not job["container_path"]:
+            container = self.database.load_container(identity_id, job["container_id"])
+            if container is None:
+                raise ValueError(f"Unknown container {job['container_id']}")
+            return container["image_path"]
+        return job["container_path"]
+
+    def record_tasks(
+        self,
+        client,
+        identity_id,
+        endpoint_id,
+        tasks,
+        task_group_id=None,
+        principal=None,
+    ):
+        """Save newly submitted tasks and start watching their status.
+
+        ``tasks`` is a list of ``(task_id, log_path)`` pairs.
+        """
+        task_create_time = now()
+        self.database.save_tasks(
+            {
+                "task_id": task_id,
+                "identity_id": identity_id,
+                "task_create_time": task_create_time,
+                "task_group_id": task_group_id,
+                "endpoint_id": endpoint_id,
+                "log_path": log_path,
+                "principal": principal,
+            }
+            for task_id, log_path in tasks
+        )
+        self.status_poller.watch(
+            "task", identity_id, client, [task_id for task_id, _ in tasks], principal
+        )
@@ -0,0 +1,182 @@
+"""Look up Globus Compute task status in batches."""
+
+import json
+import logging
+import os
+import time
+
+from globus_compute_sdk.errors import TaskExecutionFailed
+
+from api.backend.utils.log_config import sampled
+from api.backend.utils.metrics import span
+
+# create log object with current module name
+log = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+TERMINAL_STATUSES = ("success", "failed")
+
+
+def get_batch_size():
+    """Return the configured number of task IDs per status request."""
+    return max(1, int(os.environ.get("TASK_STATUS_BATCH_SIZE", DEFAULT_BATCH_SIZE)))
+
+
+def is_terminal(status):
+    """Return True once a task status can no longer change."""
+    return status in TERMINAL_STATUSES
+
+
+def status_to_record(task_id, status):
+    """Convert a Globus Compute status entry into ``task`` column values."""
+    return {
+        "task_id": task_id,
+        "task_status": status.get("status"),
+        "task_result": (
+            json.dumps(status["result"], default=str) if "result" in status else None
+        ),
+        "task_exception": status.get("exception", status.get("reason")),
+        "task_completion_time": status.get("completion_t"),
+        "task_details": (
+            json.dumps(status["details"], default=str) if "details" in status else None
+        ),
+    }
+
+
+def status_from_record(task):
+    """Rebuild a status entry from a persisted ``task`` row."""
+    status = {
+        "pending": not is_terminal(task["task_status"]),
+        "status": task["task_status"],
+    }
+    if task["task_result"] is not None:
+        status["result"] = json.loads(task["task_result"])
+    if task["task_exception"] is not None:
+        status["exception"] = task["task_exception"]
+    if task["task_completion_time"] is not None:
+        status["completion_t"] = task["task_completion_time"]
+    if task["task_details"] is not None:
+        status["details"] = json.loads(task["task_details"])
+    return status
+
+
+def chunked(items, size):
+    """Yield successive lists of at most ``size`` items."""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def lookup_failed(error):
+    """Status entry for a task whose lookup did not succeed."""
+    return {"pending": True, "status": "unknown", "error": str(error)}
+
+
+def forget_statuses(client, task_ids):
+    """Drop tasks from the client's own status cache.
+
+    Globus Compute clients keep every status they fetch, result included,
+    for as long as they live, and pooled clients live for the process.
+    """
+    table = getattr(client, "_task_status_table", None)
+    if table is not None:
+        for task_id in task_ids:
+            table.pop(task_id, None)
+
+
+def get_single_task_status(client, task_id):
+    """Fetch one task, turning a remote failure into a status entry."""
+    try:
+        with span("get_task"):
+            return client.get_task(task_id)
+    except TaskExecutionFailed as e:
+        return {
+            "pending": False,
+            "status": "failed",
+            "exception": str(e),
+            "completion_t": e.completion_t,
+        }
+    except Exception as e:
+        if sampled():
+            log.error("Error fetching status for task %s: %s", task_id, e)
+        return lookup_failed(e)
+
+
+def get_task_statuses(client, task_ids, batch_size=None):
+    """Fetch status for many tasks with one request per batch.
+
+    Tasks the batch response could not unpack (for instance tasks that
+    raised remotely) are fetched individually. A failed lookup never
+    aborts the others; it is reported as an ``unknown`` status entry with
+    an ``error`` message.
+    """
+    batch_size = batch_size or get_batch_size()
+    statuses = {}
+
+    for batch in chunked(task_ids, batch_size):
+        try:
+            with span("get_batch_result"):
+                results = client.get_batch_result(batch)
+        except Exception as e:
+            log.error(
+                "Error fetching status for a batch of %d tasks: %s", len(batch), e
+            )
+            statuses.update({task_id: lookup_failed(e) for task_id in batch})
+            continue
+
+        for task_id in batch:
+            if task_id in results:
+                statuses[task_id] = results[task_id]
+            else:
+                statuses[task_id] = get_single_task_status(client, task_id)
+
+    return statuses
+
+
+def wait_for_task(client, task_id, timeout, interval=0.25, max_interval=2):
+    """Poll one task until it finishes and return its status entry.
+
+    Returns None if it is still pending after ``timeout`` seconds. A task
+    that failed remotely comes back as a ``failed`` entry, not an exception.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        status = get_single_task_status(client, task_id)
+        if is_terminal(status.get("status")):
+            forget_statuses(client, [task_id])
+            return status
+        if time.monotonic() + interval > deadline:
+            return None
+        time.sleep(interval)
+        interval = min(interval * 2, max_interval)
+
+
+def load_task_statuses(poller, client_factory, identity_id, tasks):
+    """Return status for ``tasks``, asking Globus only about unfinished ones.
+
+    Tasks already persisted in a terminal state are served from the
+    database row. Unfinished tasks go through the status ``poller``, which
+    writes back any that reach a terminal state so they are never fetched
+    again. Each task is looked up with ``client_factory(principal)``, the
+    client of whoever submitted it, and only when something is unfinished.
+    """
+    statuses = {}
+    pending = {}
+    for task in tasks:
+        if is_terminal(task["task_status"]):
+            statuses[task["task_id"]] = status_from_record(task)
+        else:
+            pending.setdefault(task["principal"], []).append(task["task_id"])
+
+    for principal, pending_ids in pending.items():
+        statuses.update(
+            poller.lookup(
+                "task",
+                identity_id,
+                client_factory(principal),
+                pending_ids,
+                principal,
+            )
+        )
+
+    return statuses
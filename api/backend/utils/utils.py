@@ -1,5 +1,7 @@
+import logging
 import os
-from threading import Lock
+import time
+from threading import Lock, Thread
 
 import globus_sdk
 from flask import request
@@ -9,6 +11,12 @@ try:
 except ImportError:
     from urllib.parse import urljoin, urlparse
 
+# create log object with current module name
+log = logging.getLogger(__name__)
+
+_portal_client = None
+_portal_client_lock = Lock()
+
 
 def load_portal_client():
     """Create an AuthClient for the portal"""
@@ -17,6 +25,19 @@ def load_portal_client():
     )
 
 
+def get_portal_client():
+    """Return the AuthClient shared by stateless portal calls.
+
+    Use ``load_portal_client`` for an OAuth2 login flow, which keeps
+    per-login state on the client.
+    """
+    global _portal_client
+    with _portal_client_lock:
+        if _portal_client is None:
+            _portal_client = load_portal_client()
+        return _portal_client
+
+
 def is_safe_redirect_url(target):
     """https://security.openstack.org/guidelines/dg_avoid-unvalidated-redirects.html"""  # noqa
     host_url = urlparse(request.host_url)
@@ -41,6 +62,107 @@ def get_safe_redirect():
     return "/"
 
 
+class PortalTokenCache:
+    """Client-credentials tokens of the portal, cached until they expire.
+
+    Tokens are reused until ``expiry_margin`` seconds before ``expires_at``.
+    Within ``refresh_margin`` seconds of it, one background refresh per
+    scope set replaces them ahead of time. When they must be fetched
+    synchronously, only one thread per scope set asks Globus Auth and the
+    others wait for its answer.
+    """
+
+    def __init__(self, refresh_margin, expiry_margin):
+        """Constructor."""
+        self.refresh_margin = refresh_margin
+        self.expiry_margin = expiry_margin
+        self._lock = Lock()
+        # scope string -> (access tokens by resource server, expires_at)
+        self._entries = {}
+        # scope string -> Lock held while fetching those scopes
+        self._fetch_locks = {}
+        self._refreshing = set()
+
+    def get(self, scope_string):
+        """Return access tokens by resource server for the given scopes."""
+        entry = self._entries.get(scope_string)
+        if entry is not None and self._usable(entry):
+            if time.time() >= entry[1] - self.refresh_margin:
+                self._refresh_in_background(scope_string)
+            return entry[0]
+
+        with self._fetch_lock(scope_string):
+            # another thread may have fetched them while this one waited
+            entry = self._entries.get(scope_string)
+            if entry is not None and self._usable(entry):
+                return entry[0]
+            return self._fetch(scope_string)
+
+    def _usable(self, entry):
+        return time.time() < entry[1] - self.expiry_margin
+
+    def _fetch_lock(self, scope_string):
+        with self._lock:
+            return self._fetch_locks.setdefault(scope_string, Lock())
+
+    def _fetch(self, scope_string):
+        """Ask Globus Auth for tokens and cache them."""
+        tokens = get_portal_client().oauth2_client_credentials_tokens(
+            requested_scopes=scope_string
+        )
+
+        # walk all resource servers in the token response (includes the
+        # top-level server, as found in tokens.resource_server), and store the
+        # relevant Access Tokens
+        access_tokens = {
+            resource_server: {
+                "token": token_info["access_token"],
+                "scope": token_info["scope"],
+                "expires_at": token_info["expires_at_seconds"],
+            }
+            for resource_server, token_info in tokens.by_resource_server.items()
+        }
+        expires_at = min(
+            (token["expires_at"] for token in access_tokens.values()),
+            default=time.time(),
+        )
+        self._entries[scope_string] = (access_tokens, expires_at)
+        return access_tokens
+
+    def _refresh_in_background(self, scope_string):
+        with self._lock:
+            if scope_string in self._refreshing:
+                return
+            self._refreshing.add(scope_string)
+        Thread(
+            target=self._refresh,
+            args=(scope_string,),
+            name="portal-token-refresh",
+            daemon=True,
+        ).start()
+
+    def _refresh(self, scope_string):
+        try:
+            fetch_lock = self._fetch_lock(scope_string)
+            # skip if a request thread is already fetching these scopes
+            if fetch_lock.acquire(blocking=False):
+                try:
+                    self._fetch(scope_string)
+                finally:
+                    fetch_lock.release()
+        except Exception as e:
+            log.error("Error refreshing portal tokens: %s", e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(scope_string)
+
+
+portal_token_cache = PortalTokenCache(
+    refresh_margin=float(os.environ.get("PORTAL_TOKEN_REFRESH_MARGIN", 300)),
+    expiry_margin=float(os.environ.get("PORTAL_TOKEN_EXPIRY_MARGIN", 60)),
+)
+
+
 def get_portal_tokens(
     scopes=[
         "openid",
@@ -54,31 +176,4 @@ def get_portal_tokens(
     Uses the client_credentials grant to get access tokens on the
     Portal's "client identity."
     """
-    with get_portal_tokens.lock:
-        if not get_portal_tokens.access_tokens:
-            get_portal_tokens.access_tokens = {}
-
-        scope_string = " ".join(scopes)
-
-        client = load_portal_client()
-        tokens = client.oauth2_client_credentials_tokens(requested_scopes=scope_string)
-
-        # walk all resource servers in the token response (includes the
-        # top-level server, as found in tokens.resource_server), and store the
-        # relevant Access Tokens
-        for resource_server, token_info in tokens.by_resource_server.items():
-            get_portal_tokens.access_tokens.update(
-                {
-                    resource_server: {
-                        "token": token_info["access_token"],
-                        "scope": token_info["scope"],
-                        "expires_at": token_info["expires_at_seconds"],
-                    }
-                }
-            )
-
-        return get_portal_tokens.access_tokens
-
-
-get_portal_tokens.lock = Lock()
-get_portal_tokens.access_tokens = None
+    return portal_token_cache.get(" ".join(scopes))
@@ -0,0 +1,124 @@
+"""Functions registered with Globus Compute and run on the endpoints.
+
+Each one is serialized by source, so it imports what it needs itself.
+"""
+
+
+def container_builder_wrapper(base_image, location, name):
+    import subprocess
+    # in the same shell, so the module is loaded for apptainer
+    command = (
+        f"module load tacc-apptainer; "
+        f"apptainer pull {location}/{name} {base_image}"
+    )
+    pull = subprocess.run(
+        command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    )
+    if pull.returncode != 0:
+        # fails the build task, so the image is not reused
+        output = pull.stdout.decode(errors="replace")[-4096:]
+        raise RuntimeError(f"apptainer pull exited with {pull.returncode}:\n{output}")
+
+
+def task_wrapper(task_command, log_path, container_path):
+    import os
+    import subprocess
+    import time
+    if container_path:
+        # in the same shell, so the module is loaded for apptainer; hosts
+        # without environment modules still run it from their PATH
+        command = (
+            f"module load tacc-apptainer; "
+            f"apptainer run --nv {container_path} {task_command}"
+        )
+    else:
+        command = task_command.strip()
+    started = time.monotonic()
+    # the command writes straight into the log, so nothing is buffered here
+    with open(log_path or os.devnull, "wb") as log_file:
+        process = subprocess.Popen(
+            command, shell=True, stdout=log_file, stderr=subprocess.STDOUT
+        )
+        # unlike getrusage(RUSAGE_CHILDREN), covers only this command even
+        # when the worker runs several tasks at once
+        _, wait_status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(wait_status)
+    return {
+        "log_path": log_path,
+        "exit_code": process.returncode,
+        "wall_time": time.monotonic() - started,
+        "cpu_time": usage.ru_utime + usage.ru_stime,
+        # kilobytes on Linux
+        "max_rss": usage.ru_maxrss * 1024,
+    }
+
+
+def mpi_task_wrapper(
+    task_command, log_path, container_path, num_nodes, ranks_per_node, launcher=None
+):
+    import os
+    import shutil
+    import subprocess
+    import time
+    # set by endpoints whose MPI engine provisioned the nodes and ranks
+    prefix = os.environ.get("PARSL_MPI_PREFIX") if launcher is None else None
+    if not prefix:
+        ranks = num_nodes * ranks_per_node
+        if launcher is None:
+            launcher = next(
+                (name for name in ("ibrun", "srun") if shutil.which(name)), "mpiexec"
+            )
+        if launcher == "ibrun":
+            prefix = f"ibrun -n {ranks}"
+        elif launcher == "srun":
+            prefix = f"srun --nodes={num_nodes} --ntasks-per-node={ranks_per_node}"
+        else:
+            version = ""
+            if shutil.which("mpiexec"):
+                version = subprocess.run(
+                    ["mpiexec", "--version"], capture_output=True, text=True
+                ).stdout
+            # -ppn is MPICH (Hydra) and Intel MPI only
+            if "Open MPI" in version or "OpenRTE" in version:
+                per_node = f"--map-by ppr:{ranks_per_node}:node"
+            else:
+                per_node = f"-ppn {ranks_per_node}"
+            prefix = f"mpiexec -n {ranks} {per_node}"
+    if container_path:
+        # every rank starts its own container on its node
+        command = (
+            f"module load tacc-apptainer; "
+            f"{prefix} apptainer run --nv {container_path} {task_command}"
+        )
+    else:
+        command = f"{prefix} {task_command}"
+    started = time.monotonic()
+    # the command writes straight into the log, so nothing is buffered here
+    with open(log_path or os.devnull, "wb") as log_file:
+        exit_code = subprocess.run(
+            command, shell=True, stdout=log_file, stderr=subprocess.STDOUT
+        ).returncode
+    # rusage here would only cover the launcher, not ranks on other nodes
+    return {
+        "log_path": log_path,
+        "exit_code": exit_code,
+        "wall_time": time.monotonic() - started,
+    }
+
+
+def log_tail_wrapper(log_path, offset, length):
+    import os
+    size = os.path.getsize(log_path)
+    truncated = offset > size
+    if truncated:
+        # the log was truncated or replaced; start over from the beginning
+        offset = 0
+    with open(log_path, "rb") as log_file:
+        log_file.seek(offset)
+        data = log_file.read(length)
+    return {
+        "data": data,
+        "offset": offset + len(data),
+        "size": size,
+        "truncated": truncated,
+    }
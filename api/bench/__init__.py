@@ -0,0 +1,4 @@
+"""Offline benchmarks for the Flask backend.
+
+Run from the repository root with ``python -m api.bench --help``.
+"""
@@ -0,0 +1,258 @@
+"""Drive the backend routes against a fake Globus Compute service.
+
+The backend runs in-process through the Flask test client, on a freshly
+seeded SQLite database of ``--users`` x ``--tasks`` tasks, with every Globus
+Compute client replaced by :class:`FakeComputeClient`. Each route is hit
+``--requests`` times at ``--concurrency`` and the report lists latency
+percentiles, throughput and outbound Globus calls per request::
+
+    python -m api.bench --users 20 --tasks 200 --latency 0.05 --concurrency 16
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from api.bench.fake_compute import FakeComputeService
+
+# seeded tasks that have already finished, the rest are still running
+FINISHED_FRACTION = 0.8
+
+ROUTES = {
+    "get_task_status": ("GET", "/api/get_task_status", None),
+    "get_task_status_page": ("GET", "/api/get_task_status?limit=50", None),
+    "get_containers": ("GET", "/api/get_containers", None),
+    "list_active_endpoints": ("GET", "/api/list_active_endpoints", None),
+    "submit_task": (
+        "POST",
+        "/api/submit_task",
+        lambda service: {
+            "endpoint": service.endpoints[0]["uuid"],
+            "task": "echo bench",
+            "log_path": f"/tmp/bench-{uuid.uuid4()}.log",
+            "container_path": None,
+        },
+    ),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m api.bench", description=__doc__)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=100, help="tasks per user")
+    parser.add_argument("--containers", type=int, default=10, help="per user")
+    parser.add_argument("--requests", type=int, default=200, help="per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="seconds per Globus call"
+    )
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--routes", nargs="+", choices=sorted(ROUTES), default=list(ROUTES)
+    )
+    parser.add_argument(
+        "--poller",
+        action="store_true",
+        help="run the background status poller while benchmarking",
+    )
+    parser.add_argument("--database", help="reuse this database instead of seeding")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep backend logs")
+    return parser.parse_args()
+
+
+def load_backend(args, service):
+    """Import the backend on a bench database with the fake client wired in."""
+    database_path = args.database or os.path.join(
+        tempfile.mkdtemp(prefix="diamond-bench-"), "bench.db"
+    )
+    os.environ["DATABASE"] = database_path
+    os.environ["STATUS_POLLER_ENABLED"] = "true" if args.poller else "false"
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    from api.backend.utils import login_flow
+
+    login_flow.build_globus_compute_client = lambda *tokens: service.client()
+
+    from api.backend import index
+
+    index.app.secret_key = index.app.secret_key or "bench"
+    return index, database_path
+
+
+def identity(user):
+    return f"bench-identity-{user}"
+
+
+def seed_database(index, args):
+    """Insert ``args.tasks`` tasks and ``args.containers`` builds per user."""
+    from api.backend.utils.task_status import status_to_record
+
+    database = index.database
+    rng = random.Random(args.seed)
+    start = datetime.now() - timedelta(days=30)
+    with index.app.app_context():
+        for user in range(args.users):
+            tasks = []
+            finished = []
+            for n in range(args.tasks):
+                task_id = str(uuid.UUID(int=rng.getrandbits(128)))
+                created = start + timedelta(minutes=n)
+                tasks.append(
+                    {
+                        "task_id": task_id,
+                        "identity_id": identity(user),
+                        "task_create_time": created.strftime("%Y-%m-%d %H:%M:%S"),
+                        "task_group_id": None,
+                        "endpoint_id": None,
+                        "log_path": f"/tmp/bench-{task_id}.log",
+                        "principal": None,
+                    }
+                )
+                if rng.random() < FINISHED_FRACTION:
+                    status = {
+                        "status": rng.choice(["success", "failed"]),
+                        "result": f"/tmp/bench-{task_id}.log",
+                        "completion_t": str(created.timestamp()),
+                    }
+                    finished.append(status_to_record(task_id, status))
+            database.save_tasks(tasks)
+            database.update_task_statuses(finished)
+
+            for n in range(args.containers):
+                container_task_id = str(uuid.UUID(int=rng.getrandbits(128)))
+                database.save_container(
+                    container_task_id=container_task_id,
+                    identity_id=identity(user),
+                    base_image="docker://python:3.12",
+                    name=f"container-{user}-{n}",
+                    location="/tmp",
+                    description="bench",
+                    container_create_time=(start + timedelta(hours=n)).strftime(
+                        "%Y-%m-%d %H:%M:%S"
+                    ),
+                )
+            statuses = [
+                (container["container_task_id"], "success")
+                for container in database.load_containers(identity_id=identity(user))
+                if rng.random() < FINISHED_FRACTION
+            ]
+            database.update_container_statuses(statuses)
+
+
+def make_client(app, user):
+    """Flask test client logged in as a bench user."""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["primary_identity"] = identity(user)
+        session["tokens"] = {"bench": True}
+    tokens = {
+        "compute": {
+            "resource_server": "funcx_service",
+            "access_token": f"compute-{user}",
+        },
+        "auth": {"scope": "openid profile", "access_token": f"auth-{user}"},
+    }
+    client.set_cookie("tokens", json.dumps(tokens))
+    return client
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def run_route(app, service, args, name):
+    """Send ``args.requests`` requests to one route and summarize them."""
+    method, path, body = ROUTES[name]
+    local = threading.local()
+    rng = random.Random(args.seed)
+    users = [rng.randrange(args.users) for _ in range(args.requests)]
+
+    def send(user):
+        clients = local.__dict__.setdefault("clients", {})
+        client = clients.get(user)
+        if client is None:
+            client = clients[user] = make_client(app, user)
+        started = time.perf_counter()
+        response = client.open(
+            path, method=method, json=body(service) if body else None
+        )
+        response.get_data()
+        return time.perf_counter() - started, response.status_code < 400
+
+    calls_before = service.total_calls()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(send, users))
+    elapsed = time.perf_counter() - started
+    calls = service.total_calls() - calls_before
+
+    latencies = [latency for latency, _ in results]
+    return {
+        "route": name,
+        "requests": len(results),
+        "errors": sum(1 for _, ok in results if not ok),
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "requests_per_sec": len(results) / elapsed,
+        "calls_per_request": calls / len(results),
+    }
+
+
+def print_report(results):
+    header = (
+        f"{'route':<24}{'requests':>9}{'errors':>8}{'p50 ms':>10}"
+        f"{'p99 ms':>10}{'req/s':>10}{'calls/req':>11}"
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result['route']:<24}{result['requests']:>9}{result['errors']:>8}"
+            f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+            f"{result['requests_per_sec']:>10.1f}{result['calls_per_request']:>11.2f}"
+        )
+
+
+def main():
+    args = parse_args()
+    service = FakeComputeService(
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    index, database_path = load_backend(args, service)
+    if not args.database:
+        seed_database(index, args)
+    print(
+        f"{args.users} users x {args.tasks} tasks in {database_path}, "
+        f"{args.latency * 1000:.0f} ms Globus latency, "
+        f"{args.failure_rate:.0%} failures, concurrency {args.concurrency}"
+    )
+
+    results = [run_route(index.app, service, args, name) for name in args.routes]
+    print_report(results)
+    print(f"outbound calls by type: {dict(service.calls)}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
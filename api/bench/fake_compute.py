@@ -0,0 +1,119 @@
+"""Local stand-in for the Globus Compute service used by the benchmarks."""
+
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+
+RUNNING = {"pending": True, "status": "running"}
+
+
+class FakeComputeError(Exception):
+    """Injected failure of a fake Globus Compute call."""
+
+
+class FakeSerializer:
+    """Serializes functions by their bytecode, like a stable code hash."""
+
+    def serialize(self, function):
+        return f"{function.__qualname__}:{function.__code__.co_code.hex()}"
+
+
+class FakeBatch:
+    """Collects the tasks of a batch submission."""
+
+    def __init__(self):
+        self.tasks = []
+
+    def add(self, function_id, args=(), kwargs=None):
+        self.tasks.append((function_id, args, kwargs or {}))
+
+
+class FakeComputeService:
+    """Shared state behind every fake client.
+
+    Each call sleeps for ``latency`` seconds, give or take ``jitter`` of it,
+    then fails with probability ``failure_rate``. Calls are counted by name
+    so a benchmark can report outbound calls per request.
+    """
+
+    def __init__(
+        self, latency=0.05, jitter=0.2, failure_rate=0.0, endpoints=5, seed=0
+    ):
+        """Constructor."""
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.endpoints = [
+            {"uuid": str(uuid.UUID(int=n + 1)), "name": f"endpoint-{n}"}
+            for n in range(endpoints)
+        ]
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    def client(self):
+        """Return a new fake client backed by this service."""
+        return FakeComputeClient(self)
+
+    def total_calls(self):
+        """Return the number of outbound calls made so far."""
+        with self._lock:
+            return sum(self.calls.values())
+
+    def call(self, name):
+        """Account for one outbound call, with its latency and failures."""
+        with self._lock:
+            self.calls[name] += 1
+            spread = self._random.uniform(-self.jitter, self.jitter)
+            failed = self._random.random() < self.failure_rate
+        time.sleep(max(self.latency * (1 + spread), 0))
+        if failed:
+            raise FakeComputeError(f"injected failure in {name}")
+
+
+class FakeComputeClient:
+    """Implements the subset of ``globus_compute_sdk.Client`` the backend uses."""
+
+    def __init__(self, service):
+        """Constructor."""
+        self.service = service
+        self.fx_serializer = FakeSerializer()
+
+    def register_function(self, function, **kwargs):
+        self.service.call("register_function")
+        return str(uuid.uuid4())
+
+    def run(self, *args, endpoint_id=None, function_id=None, **kwargs):
+        self.service.call("run")
+        return str(uuid.uuid4())
+
+    def create_batch(self):
+        return FakeBatch()
+
+    def batch_run(self, endpoint_id, batch):
+        self.service.call("batch_run")
+        task_ids = [str(uuid.uuid4()) for _ in batch.tasks]
+        function_id = batch.tasks[0][0] if batch.tasks else None
+        return {
+            "task_group_id": str(uuid.uuid4()),
+            "tasks": {function_id: task_ids},
+        }
+
+    def get_batch_result(self, task_ids):
+        self.service.call("get_batch_result")
+        return {task_id: dict(RUNNING) for task_id in task_ids}
+
+    def get_task(self, task_id):
+        self.service.call("get_task")
+        return dict(RUNNING)
+
+    def get_endpoints(self):
+        self.service.call("get_endpoints")
+        return list(self.service.endpoints)
+
+    def get_endpoint_status(self, endpoint_uuid):
+        self.service.call("get_endpoint_status")
+        online = int(uuid.UUID(endpoint_uuid)) % 2 == 1
+        return {"status": "online" if online else "offline"}
@@ -0,0 +1,29 @@
+"""Gunicorn settings for the Flask backend.
+
+SERVER_MODE selects how requests waiting on Globus are served:
+
+- ``sync`` (default): threaded workers. Every in-flight request, including
+  one blocked on a Globus HTTP call or holding a status stream open, pins a
+  thread, so concurrency is capped by ``THREADS``.
+- ``async``: gevent workers. Sockets are cooperative, so a request blocked
+  on Globus I/O yields to the others and concurrency is bounded by
+  ``WORKER_CONNECTIONS`` rather than by threads. The backend's own
+  threads (status poller, endpoint probes, cache refresh) become greenlets.
+"""
+
+import os
+
+bind = "0.0.0.0:5328"
+wsgi_app = "api.backend.index:app"
+
+server_mode = os.environ.get("SERVER_MODE", "sync")
+workers = int(os.environ.get("WORKERS", 1))
+
+if server_mode == "async":
+    worker_class = "gevent"
+    worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 1000))
+elif server_mode == "sync":
+    worker_class = "gthread"
+    threads = int(os.environ.get("THREADS", 100))
+else:
+    raise ValueError(f"Unknown SERVER_MODE {server_mode!r}, expected sync or async")
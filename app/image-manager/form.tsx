@@ -60,6 +60,7 @@ export function ContainerManagerForm() {
             <th className="border px-4 py-2">Container Status</th>
             <th className="border px-4 py-2">Base Image</th>
             <th className="border px-4 py-2">Location</th>
+            <th className="border px-4 py-2">Image</th>
             <th className="border px-4 py-2">Description</th>
             <th className="border px-4 py-2">Actions</th>
           </tr>
@@ -72,6 +73,14 @@ export function ContainerManagerForm() {
                 <td className="border px-4 py-2">{containersData[containerName]?.status || ''}</td>
                 <td className="border px-4 py-2">{containersData[containerName]?.base_image || ''}</td>
                 <td className="border px-4 py-2">{containersData[containerName]?.location || ''}</td>
+                <td className="border px-4 py-2">
+                  {containersData[containerName]?.image_path || ''}
+                  {containersData[containerName]?.cache_hit && (
+                    <span className="ml-2 rounded bg-green-100 px-2 py-0.5 text-xs text-green-800">
+                      cached
+                    </span>
+                  )}
+                </td>
                 <td className="border px-4 py-2">{containersData[containerName]?.description || ''}</td>
                 <td className="border px-4 py-2">
                   <button
@@ -85,7 +94,7 @@ export function ContainerManagerForm() {
             ))
           ) : (
             <tr>
-              <td className="border px-4 py-2" colSpan="5">No containers found.</td>
+              <td className="border px-4 py-2" colSpan="7">No containers found.</td>
             </tr>
           )}
         </tbody>
@@ -2,6 +2,25 @@
 
 import { useEffect, useState } from 'react';
 
+// task_wrapper returns its resource use; older tasks return only the log path
+const taskUsage = (result) =>
+  result && typeof result === 'object' ? result : { log_path: result };
+
+const formatSeconds = (seconds) =>
+  seconds == null ? '' : `${seconds.toFixed(seconds < 10 ? 2 : 0)} s`;
+
+const formatBytes = (bytes) => {
+  if (bytes == null) return '';
+  const units = ['B', 'KiB', 'MiB', 'GiB', 'TiB'];
+  let value = bytes;
+  let unit = 0;
+  while (value >= 1024 && unit < units.length - 1) {
+    value /= 1024;
+    unit += 1;
+  }
+  return `${value.toFixed(unit ? 1 : 0)} ${units[unit]}`;
+};
+
 export function TaskManagerForm() {
   const [tasksData, setTasksData] = useState({});
 
@@ -60,30 +79,41 @@ export function TaskManagerForm() {
             <th className="border px-4 py-2">Endpoint</th>
             <th className="border px-4 py-2">Task Status</th>
             <th className="border px-4 py-2">Log Path</th>
+            <th className="border px-4 py-2">Exit Code</th>
+            <th className="border px-4 py-2">Wall Time</th>
+            <th className="border px-4 py-2">CPU Time</th>
+            <th className="border px-4 py-2">Peak Memory</th>
             <th className="border px-4 py-2">Actions</th>
           </tr>
         </thead>
         <tbody>
           {Object.keys(tasksData).length > 0 ? (
-            Object.keys(tasksData).map((taskId) => (
-              <tr key={taskId}>
-                <td className="border px-4 py-2">{taskId}</td>
-                <td className="border px-4 py-2">{tasksData[taskId]?.details?.endpoint_id || ''}</td>
-                <td className="border px-4 py-2">{tasksData[taskId]?.status || ''}</td>
-                <td className="border px-4 py-2">{tasksData[taskId]?.result || ''}</td>
-                <td className="border px-4 py-2">
-                  <button
-                    onClick={() => deletetask(taskId)}
-                    className="bg-red-500 text-white px-4 py-1 rounded hover:bg-red-700"
-                  >
-                    Delete
-                  </button>
-                </td>
-              </tr>
-            ))
+            Object.keys(tasksData).map((taskId) => {
+              const usage = taskUsage(tasksData[taskId]?.result);
+              return (
+                <tr key={taskId}>
+                  <td className="border px-4 py-2">{taskId}</td>
+                  <td className="border px-4 py-2">{tasksData[taskId]?.details?.endpoint_id || ''}</td>
+                  <td className="border px-4 py-2">{tasksData[taskId]?.status || ''}</td>
+                  <td className="border px-4 py-2">{usage.log_path || ''}</td>
+                  <td className="border px-4 py-2">{usage.exit_code ?? ''}</td>
+                  <td className="border px-4 py-2">{formatSeconds(usage.wall_time)}</td>
+                  <td className="border px-4 py-2">{formatSeconds(usage.cpu_time)}</td>
+                  <td className="border px-4 py-2">{formatBytes(usage.max_rss)}</td>
+                  <td className="border px-4 py-2">
+                    <button
+                      onClick={() => deletetask(taskId)}
+                      className="bg-red-500 text-white px-4 py-1 rounded hover:bg-red-700"
+                    >
+                      Delete
+                    </button>
+                  </td>
+                </tr>
+              );
+            })
           ) : (
             <tr>
-              <td className="border px-4 py-2" colSpan="5">No tasks found.</td>
+              <td className="border px-4 py-2" colSpan="9">No tasks found.</td>
             </tr>
           )}
         </tbody>